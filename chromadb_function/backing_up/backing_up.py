@@ -1,9 +1,58 @@
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from google.api_core import exceptions
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from backing_up.utilities import get_current_timestamp
 
+# Maximum number of calls the GCS JSON API accepts in a single batch request
+GCS_BATCH_SIZE = 100
+
+# Number of pooled HTTPS connections of the shared storage client
+GCS_HTTP_POOL_SIZE = 64
+
+_client: Optional[storage.Client] = None
+
+
+def _get_client() -> storage.Client:
+    """
+    Return the storage client shared within the process, creating it on first use.
+
+    Reusing one client avoids a new authorized session, TLS handshake and token
+    refresh for every BackupClient.
+
+    Returns:
+        Shared storage client
+    """
+    global _client
+    if _client is None:
+        _client = storage.Client()
+        _configure_http_pool(_client, GCS_HTTP_POOL_SIZE)
+    return _client
+
+
+def _configure_http_pool(client: storage.Client, pool_size: int) -> None:
+    """
+    Replace the default HTTPS adapter of a storage client with a larger pool.
+
+    The default adapter keeps at most 10 connections, which serializes
+    concurrent requests beyond that.
+
+    Args:
+        client: Storage client to configure
+        pool_size: Number of pooled HTTPS connections
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client._http.mount("https://", adapter)
+
 
 class BackupClient:
     """
@@ -13,64 +62,49 @@ class BackupClient:
     maintaining a specified number of most recent backups.
     """
 
-    def __init__(self, source_storage_name: str, backup_storage_name: str):
+    def __init__(
+        self,
+        source_storage_name: str,
+        backup_storage_name: str,
+        max_workers: int = 32,
+        storage_client: Optional[storage.Client] = None,
+    ):
         """
         Initialize the backup service with source and destination bucket names.
 
         Args:
             source_storage_name: Name of the source GCS bucket
             backup_storage_name: Name of the backup GCS bucket
+            max_workers: Maximum number of worker threads copying blobs
+            storage_client: Optional storage client. If None, the client shared
+                within the process is used.
         """
-        self.storage_client = storage.Client()
+        self.storage_client = storage_client or _get_client()
         self.source_storage_name = source_storage_name
         self.backup_storage_name = backup_storage_name
+        self.max_workers = max_workers
 
-    def get_folders(self, bucket: storage.Bucket) -> Dict[str, List[storage.Blob]]:
+    def get_folders(self, bucket: storage.Bucket) -> Set[str]:
         """
-        Group blobs by their top-level folder (backup).
+        Get the top-level folders (backups) of a bucket.
 
-        Args:
-            bucket: GCS bucket to search in
-
-        Returns:
-            Dictionary mapping folder names to lists of blobs in that folder
-        """
-        try:
-            blobs = list(bucket.list_blobs())
-        except Exception:
-            raise
-
-        folders: Dict[str, List[storage.Blob]] = {}
-
-        for blob in blobs:
-            parts = blob.name.split("/", 1)
-            if len(parts) > 1:
-                folder_name = parts[0] + "/"
-                if folder_name not in folders:
-                    folders[folder_name] = []
-                folders[folder_name].append(blob)
-        return folders
-
-    def get_oldest_blob(self, bucket: storage.Bucket) -> Optional[storage.Blob]:
-        """
-        Find the oldest blob in the given bucket based on creation time.
+        Folders are listed server-side with a "/" delimiter, so only folder
+        prefixes are transferred instead of every blob.
 
         Args:
             bucket: GCS bucket to search in
 
         Returns:
-            The oldest blob or None if bucket is empty
+            Set of folder names, each with a trailing "/"
         """
         try:
-            blobs = list(bucket.list_blobs())
+            iterator = bucket.list_blobs(delimiter="/")
+            for _ in iterator.pages:
+                pass
         except Exception:
             raise
 
-        if not blobs:
-            return None
-
-        oldest_blob = min(blobs, key=lambda blob: blob.time_created)
-        return oldest_blob
+        return set(iterator.prefixes)
 
     def delete_folder(self, bucket: storage.Bucket, folder_name: str) -> Dict[str, Any]:
         """
@@ -94,8 +128,8 @@ class BackupClient:
                 )
                 return result
 
-            for blob in blobs:
-                blob.delete()
+            for start in range(0, len(blobs), GCS_BATCH_SIZE):
+                self._delete_blobs(blobs[start : start + GCS_BATCH_SIZE])
 
             result["success"] = True
             result["message"] = (
@@ -106,13 +140,74 @@ class BackupClient:
         except Exception:
             raise
 
+    def _delete_blobs(self, blobs: List[storage.Blob]) -> None:
+        """
+        Delete blobs with a single batch request.
+
+        If the batch request fails, the blobs are deleted one by one so that a
+        partial failure does not leave the folder half-deleted.
+
+        Args:
+            blobs: Blobs to delete, at most GCS_BATCH_SIZE
+        """
+        try:
+            with self.storage_client.batch():
+                for blob in blobs:
+                    blob.delete()
+        except Exception:
+            for blob in blobs:
+                try:
+                    blob.delete()
+                except exceptions.NotFound:
+                    pass
+
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=0.5, max=10),
+        retry=retry_if_exception_type(
+            (
+                exceptions.TooManyRequests,
+                exceptions.ServiceUnavailable,
+                exceptions.GatewayTimeout,
+            )
+        ),
+        reraise=True,
+    )
+    def _copy_blobs(self, copies: List[Tuple[str, Optional[int], str]]) -> None:
+        """
+        Copy a chunk of blobs from the source bucket into the backup bucket.
+
+        All copies of the chunk are sent in a single GCS JSON batch request.
+        Batches are tracked per thread by the storage client, so chunks can be
+        copied concurrently over its shared connection pool. Copies are
+        idempotent, so the chunk is retried with backoff on transient errors.
+
+        Args:
+            copies: Tuples of (source blob name, source generation, destination
+                blob name), at most GCS_BATCH_SIZE
+        """
+        source_bucket = self.storage_client.bucket(self.source_storage_name)
+        destination_bucket = self.storage_client.bucket(self.backup_storage_name)
+
+        with self.storage_client.batch():
+            for blob_name, generation, destination_blob_name in copies:
+                source_bucket.copy_blob(
+                    source_bucket.blob(blob_name),
+                    destination_bucket,
+                    destination_blob_name,
+                    source_generation=generation,
+                )
+
     def backup(self, backups_number: int) -> Dict[str, Any]:
         """
         Perform backup from source to destination bucket.
 
         This method copies all blobs from source to destination bucket into a timestamped
-        directory. If the number of backups exceeds backups_number, the oldest backup will
-        be deleted.
+        directory. Copies are grouped into batch requests which are fanned out across
+        worker threads. The copies are rewritten server-side by GCS, so threads
+        sharing the client's connection pool are enough to keep them in flight. If
+        the number of backups exceeds backups_number, the oldest backup will be
+        deleted.
 
         Args:
             backups_number: Maximum number of backups to keep
@@ -136,7 +231,9 @@ class BackupClient:
                     f"Destination bucket {self.backup_storage_name} does not exist"
                 )
 
-            source_blobs = list(source_bucket.list_blobs())
+            source_blobs = list(
+                source_bucket.list_blobs(fields="items(name,generation),nextPageToken")
+            )
 
             if not source_blobs:
                 result["success"] = True
@@ -145,21 +242,24 @@ class BackupClient:
 
             backup_folders = self.get_folders(destination_bucket)
 
-            if len(backup_folders) >= backups_number:
-                oldest_blob = self.get_oldest_blob(destination_bucket)
-                if oldest_blob:
-                    folder_name = oldest_blob.name.split("/")[0]
-                    result = self.delete_folder(destination_bucket, folder_name)
+            if backup_folders and len(backup_folders) >= backups_number:
+                oldest_folder = min(backup_folders)
+                result = self.delete_folder(destination_bucket, oldest_folder)
 
             current_time = get_current_timestamp()
 
-            for blob in source_blobs:
-                destination_blob_name = f"{current_time}/{blob.name}"
-                source_blob = source_bucket.blob(blob.name)
-
-                source_bucket.copy_blob(
-                    source_blob, destination_bucket, destination_blob_name
-                )
+            copies = [
+                (blob.name, blob.generation, f"{current_time}/{blob.name}")
+                for blob in source_blobs
+            ]
+            chunks = [
+                copies[start : start + GCS_BATCH_SIZE]
+                for start in range(0, len(copies), GCS_BATCH_SIZE)
+            ]
+            workers = max(1, min(self.max_workers, len(chunks)))
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._copy_blobs, chunks))
 
             result["success"] = True
             result["message"] = f"Successfully backed up {len(source_blobs)} blobs"
@@ -2,8 +2,6 @@ import datetime
 
 
 def get_current_timestamp() -> str:
-    current_timestamp = datetime.datetime.now(datetime.timezone.utc).replace(
-        microsecond=0
-    )
+    current_timestamp = datetime.datetime.now(datetime.timezone.utc)
 
     return current_timestamp.strftime("%Y-%m-%d_%H-%M-%S")
@@ -10,44 +10,59 @@ warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 COLLECTION_NAME = "collection_text-embedding-005_512_512"
 CHROMA_HOST = ...
 CHROMA_PORT = ...
+UPDATE_BATCH_SIZE = 128
+UPDATE_PREFETCH_BATCHES = 16
+UPDATE_MIN_SEEN_FRACTION = 0.5
 
 # GCP Storage
 CHROMA_STORAGE_NAME = "chromadb-vectors-storage"
 BACKUP_STORAGE_NAME = "chromadb-backups"
+LINK_CACHE_STORAGE_NAME = BACKUP_STORAGE_NAME
+LINK_CACHE_BLOB_NAME = "confluence-link-cache.json"
+LINK_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+EMBEDDING_CACHE_STORAGE_NAME = BACKUP_STORAGE_NAME
+EMBEDDING_CACHE_BLOB_NAME = "embedding-cache.npz"
 
 # Backups settings
 BACKUPS_NUMBER = 3
+BACKUP_WORKERS = 32
 
 # Fetching settings
 MAX_WORKERS = 5
 
+# Processing settings
+PROCESSING_WORKERS = os.cpu_count() or 1
+
 # Confluence
 CONFLUENCE_URL = "https://innowise-group.atlassian.net"
 CONFLUENCE_USERNAME = os.environ.get("CONFLUENCE_USERNAME")
 CONFLUENCE_PASSWORD = os.environ.get("CONFLUENCE_API_TOKEN")
 CONFLUENCE_SPACE = "QD"
-EXCLUDE_PAGES_IDS = ["2639986781", "2695463266", "2710208755", "2760704026"]
+CONFLUENCE_HTTP_POOL_SIZE = 20
+EXCLUDE_PAGES_IDS = frozenset({"2639986781", "2695463266", "2710208755", "2760704026"})
 
 # Chunking settings
-KEEP_TAGS = {
-    "table",
-    "tr",
-    "td",
-    "th",
-    "h1",
-    "h2",
-    "h3",
-    "h4",
-    "h5",
-    "h6",
-    "a",
-    "ol",
-    "ul",
-    "li",
-    "ac:link",
-    "ri:user",
-    "ri:page",
-}
+KEEP_TAGS = frozenset(
+    {
+        "table",
+        "tr",
+        "td",
+        "th",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "a",
+        "ol",
+        "ul",
+        "li",
+        "ac:link",
+        "ri:user",
+        "ri:page",
+    }
+)
 CHUNK_OVERLAP = 0.0
 CHUNK_SIZE = 512
 
@@ -55,3 +70,5 @@ CHUNK_SIZE = 512
 VERTEXAI_MODEL_NAME = "text-embedding-005"
 VERTEXAI_TASK_TYPE = "RETRIEVAL_DOCUMENT"
 VERTEXAI_VECTOR_DIMENSIONS = 512
+VERTEXAI_EMBEDDING_BATCH_SIZE = 250
+VERTEXAI_EMBEDDING_WORKERS = 4
@@ -1,8 +1,50 @@
-from typing import Any, Dict, List, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional
 
+import numpy as np
 from chromadb.api.types import EmbeddingFunction, Embeddings
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    InternalServerError,
+    ResourceExhausted,
+    ServiceUnavailable,
+)
+from tenacity import (
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 
+# Vertex AI errors worth retrying: rate limits, overload and server failures
+TRANSIENT_ERRORS = (
+    DeadlineExceeded,
+    InternalServerError,
+    ResourceExhausted,
+    ServiceUnavailable,
+)
+
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str) -> TextEmbeddingModel:
+    """
+    Returns the embedding model client, loading it once per process.
+
+    Embedders and tokenizers of the same model share the client, and warm
+    function instances reuse it across invocations.
+
+    Args:
+        model_name: Name of the pretrained embedding model.
+
+    Returns:
+        Embedding model client.
+    """
+    return TextEmbeddingModel.from_pretrained(model_name)
+
 
 class VertexAIChromaEmbedder(EmbeddingFunction):
     """
@@ -10,13 +52,20 @@ class VertexAIChromaEmbedder(EmbeddingFunction):
     Follows ChromaDB's EmbeddingFunction interface for better compatibility.
     """
 
+    # Vertex AI rejects requests above 20,000 tokens; the margin covers the
+    # error of the token estimate
+    MAX_BATCH_TOKENS = 18000
+
     def __init__(
         self,
         model_name: str,
         task_type: str,
         dimensions: Optional[int] = None,
-        batch_size: int = 5,
+        batch_size: int = 250,
         retry_attempts: int = 3,
+        retry_delay: float = 1.0,
+        max_workers: int = 4,
+        cache: Optional[Mapping[str, np.ndarray]] = None,
     ) -> None:
         """
         Initializes the embedder based on Vertex AI.
@@ -32,64 +81,188 @@ class VertexAIChromaEmbedder(EmbeddingFunction):
                 - "CLUSTERING": for clustering tasks
             dimensions: Target dimensionality of output embeddings. If None,
                        the model's default dimensionality is used.
-            batch_size: Batch size for processing texts.
+            batch_size: Maximum number of texts per API call. Batches are
+                also cut at MAX_BATCH_TOKENS estimated tokens.
             retry_attempts: Number of retry attempts for API errors.
+            retry_delay: Delay before the first retry in seconds, doubled for
+                every further retry.
+            max_workers: Maximum number of API calls in flight at once.
+            cache: Embeddings from previous runs, keyed by cache_key. If given,
+                only documents missing from it are sent to Vertex AI, and all
+                embeddings returned are collected in cached_embeddings.
         """
-        self.model = TextEmbeddingModel.from_pretrained(model_name)
+        self.model_name = model_name
+        self.model = _get_model(model_name)
         self.task_type = task_type
         self.dimensions = dimensions
         self.batch_size = batch_size
         self.retry_attempts = retry_attempts
+        self.retry_delay = retry_delay
+        self.max_workers = max_workers
+        self.cache = cache
+        self.cached_embeddings: Dict[str, np.ndarray] = {}
 
     def __call__(self, input: List[Dict[str, Any]]) -> Embeddings:
         """
         Creates embeddings for a list of documents.
         This follows ChromaDB's EmbeddingFunction interface.
 
+        With a cache, documents embedded before are taken from it and only the
+        others are sent to Vertex AI.
+
         Args:
             input: List of strings (documents) to embed.
 
         Returns:
-            List of embedding vectors.
+            Float32 array with one embedding vector per row.
         """
-        all_embeddings = []
-        for i in range(0, len(input), self.batch_size):
-            batch_texts = input[i : i + self.batch_size]
-            batch_embeddings = self._get_embeddings_with_retry(batch_texts)
-            all_embeddings.extend(batch_embeddings)
+        if self.cache is None:
+            return self._embed(input)
+
+        keys = [self.cache_key(text) for text in input]
+        cached = [self.cached_embeddings.get(key) for key in keys]
+        cached = [
+            self.cache.get(key) if embedding is None else embedding
+            for key, embedding in zip(keys, cached)
+        ]
+
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if missing:
+            new_embeddings = self._embed([input[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                cached[i] = embedding
+
+        all_embeddings = np.stack(cached).astype(np.float32, copy=False)
+        self.cached_embeddings.update(zip(keys, all_embeddings))
 
         return all_embeddings
 
-    def _get_embeddings_with_retry(
-        self, texts: List[Dict[str, Any]]
-    ) -> List[List[float]]:
+    def cache_key(self, text: Dict[str, Any]) -> str:
         """
-        Gets embeddings with retry support for error handling.
+        Returns the cache key of a document.
+
+        The key covers everything the embedding depends on: the model, task
+        type, dimensionality, title and text.
 
         Args:
-            texts: List of strings to embed.
+            text: Document to embed.
 
         Returns:
-            List of embedding vectors.
+            Hex digest identifying the document's embedding.
+        """
+        content = "\0".join(
+            (
+                self.model_name,
+                self.task_type,
+                str(self.dimensions),
+                text.get("title", ""),
+                text.get("page_content", ""),
+            )
+        )
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
 
-        Raises:
-            Exception: If all embedding attempts fail.
+    def _embed(self, input: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Creates embeddings for a list of documents, one API call per batch.
+
+        The calls only wait on the network, so up to max_workers batches are
+        sent at once.
+
+        Args:
+            input: List of strings (documents) to embed.
+
+        Returns:
+            Float32 array with one embedding vector per row.
+        """
+        batches = list(self._iter_batches(input))
+        if len(batches) <= 1 or self.max_workers <= 1:
+            return np.concatenate(list(map(self._get_embeddings_with_retry, batches)))
+
+        workers = min(self.max_workers, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return np.concatenate(
+                list(executor.map(self._get_embeddings_with_retry, batches))
+            )
+
+    def _iter_batches(
+        self, input: List[Dict[str, Any]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Splits documents into batches that fit one API call.
+
+        A batch holds at most batch_size documents and at most
+        MAX_BATCH_TOKENS estimated tokens. A document above the token budget
+        on its own gets a batch of its own.
+
+        Args:
+            input: List of strings (documents) to embed.
+
+        Yields:
+            Consecutive batches of documents, in input order.
+        """
+        batch: List[Dict[str, Any]] = []
+        batch_tokens = 0
+
+        for text in input:
+            tokens = self._estimate_tokens(text)
+            if batch and (
+                len(batch) >= self.batch_size
+                or batch_tokens + tokens > self.MAX_BATCH_TOKENS
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+
+            batch.append(text)
+            batch_tokens += tokens
+
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _estimate_tokens(text: Dict[str, Any]) -> int:
         """
-        attempts = 0
-        last_error = None
+        Estimates the number of tokens of a document without an API call.
 
-        while attempts < self.retry_attempts:
-            try:
-                return self._get_embeddings_batch(texts)
-            except Exception as e:
-                attempts += 1
-                last_error = e
+        Counts one token per four bytes of UTF-8, which overestimates for
+        English and stays close for Cyrillic text.
 
-        raise Exception(
-            f"Failed to get embeddings after {self.retry_attempts} attempts: {last_error}"
+        Args:
+            text: Document to embed.
+
+        Returns:
+            Estimated number of tokens of the title and text.
+        """
+        content = (text.get("title") or "") + (text.get("page_content") or "")
+        return len(content.encode()) // 4 + 1
+
+    def _get_embeddings_with_retry(self, texts: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Gets embeddings, retrying transient API errors.
+
+        Rate limits, unavailability and server errors are retried with
+        exponential backoff and jitter, so that concurrent calls do not retry
+        in lockstep. Other errors, such as invalid input, fail immediately.
+
+        Args:
+            texts: List of strings to embed.
+
+        Returns:
+            Float32 array with one embedding vector per row.
+
+        Raises:
+            Exception: If the error is not transient or all attempts fail.
+        """
+        retrying = Retrying(
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=wait_exponential(multiplier=self.retry_delay, max=30)
+            + wait_random(0, self.retry_delay),
+            retry=retry_if_exception_type(TRANSIENT_ERRORS),
+            reraise=True,
         )
+        return retrying(self._get_embeddings_batch, texts)
 
-    def _get_embeddings_batch(self, texts: List[Dict[str, Any]]) -> List[List[float]]:
+    def _get_embeddings_batch(self, texts: List[Dict[str, Any]]) -> np.ndarray:
         """
         Creates embeddings for a batch of texts.
 
@@ -114,7 +287,9 @@ class VertexAIChromaEmbedder(EmbeddingFunction):
 
         embeddings = self.model.get_embeddings(inputs, **kwargs)
 
-        embedding_vectors = [embedding.values for embedding in embeddings]
+        embedding_vectors = np.array(
+            [embedding.values for embedding in embeddings], dtype=np.float32
+        )
 
         return embedding_vectors
 
@@ -138,7 +313,7 @@ class VertexAITokenizer:
     Provides a callable interface compatible with token counting requirements.
     """
 
-    def __init__(self, model_name: str, task_type: str) -> None:
+    def __init__(self, model_name: str, task_type: str, max_workers: int = 16) -> None:
         """
         Initializes the tokenizer based on Vertex AI.
 
@@ -151,21 +326,75 @@ class VertexAITokenizer:
                 - "SEMANTIC_SIMILARITY": for semantic similarity tasks
                 - "CLASSIFICATION": for classification tasks
                 - "CLUSTERING": for clustering tasks
+            max_workers: Maximum number of concurrent CountTokens calls in
+                count_batch.
         """
-        self.model = TextEmbeddingModel.from_pretrained(model_name)
+        self.model_name = model_name
+        self.model = _get_model(model_name)
         self.task_type = task_type
+        self.max_workers = max_workers
+        # Idle threads exit once the tokenizer is garbage collected
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Returns the picklable state of the tokenizer, without the model client
+        and the thread pool.
+
+        Returns:
+            Tokenizer attributes except the model and the thread pool.
+        """
+        state = self.__dict__.copy()
+        del state["model"]
+        del state["_executor"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restores the tokenizer in another process, with its own model client
+        and thread pool.
+
+        Page workers are spawned and receive the tokenizer pickled, so the
+        model client and its gRPC channel are created in the worker itself.
+
+        Args:
+            state: Tokenizer attributes as returned by __getstate__.
+        """
+        self.__dict__.update(state)
+        self.model = _get_model(self.model_name)
+        self._executor = ThreadPoolExecutor(self.max_workers)
 
     def __call__(self, text: str) -> int:
         """
-        Counts tokens in the provided text using Vertex AI's model statistics.
+        Counts tokens in the provided text using Vertex AI's CountTokens API.
         This method allows the tokenizer to be used as a callable function.
 
+        Unlike an embedding request, counting does not run the model and is
+        not billed.
+
         Args:
             text: String text to tokenize and count.
 
         Returns:
             Number of tokens in the input text according to the model.
         """
-        inputs = [TextEmbeddingInput(text=text, task_type=self.task_type)]
-        embeddings = self.model.get_embeddings(inputs)
-        return embeddings[0].statistics.token_count
+        return self.model.count_tokens([text]).total_tokens
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """
+        Counts tokens in several texts with concurrent CountTokens calls.
+
+        CountTokens only reports the total of all texts of a call, so each
+        text is counted with its own call, up to max_workers at a time. Texts
+        are counted exactly as by __call__.
+
+        Args:
+            texts: List of strings to tokenize and count.
+
+        Returns:
+            Number of tokens in each input text, in input order.
+        """
+        if len(texts) <= 1:
+            return [self(text) for text in texts]
+
+        return list(self._executor.map(self, texts))
@@ -0,0 +1,99 @@
+import io
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+from google.api_core import exceptions
+from google.cloud import storage
+
+
+class EmbeddingCacheStore:
+    """
+    Keeps document embeddings in a GCS blob between function invocations.
+
+    Embeddings are stored as a float32 matrix with one row per cache key, in a
+    NumPy .npz archive that loads without unpickling.
+    """
+
+    def __init__(
+        self,
+        storage_name: str,
+        blob_name: str,
+        storage_client: Optional[storage.Client] = None,
+    ):
+        """
+        Initialize the store with the location of the cache blob.
+
+        Args:
+            storage_name: Name of the GCS bucket holding the cache
+            blob_name: Name of the cache blob
+            storage_client: Optional storage client. If None, a new client is
+                created.
+        """
+        self.storage_client = storage_client or storage.Client()
+        self.storage_name = storage_name
+        self.blob_name = blob_name
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the saved embeddings.
+
+        Returns:
+            Dictionary containing success status, message and embeddings, a
+            mapping of cache keys to float32 embedding vectors that is empty if
+            there is no cache. The vectors are rows of one contiguous array.
+        """
+        result = {"success": False, "message": "", "embeddings": {}}
+
+        try:
+            blob = self.storage_client.bucket(self.storage_name).blob(self.blob_name)
+            with np.load(io.BytesIO(blob.download_as_bytes())) as data:
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+
+            result["embeddings"] = dict(zip(keys, vectors))
+            result["success"] = True
+            result["message"] = f"Loaded {len(keys)} cached embeddings."
+
+        except exceptions.NotFound:
+            result["success"] = True
+            result["message"] = "No embedding cache found, starting empty."
+        except Exception as e:
+            result["message"] = f"Error loading embedding cache: {str(e)}"
+
+        return result
+
+    def save(self, embeddings: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+        """
+        Save embeddings, replacing the previous cache.
+
+        Only the given embeddings are kept, so saving the embeddings of the
+        current run drops those of documents that no longer exist.
+
+        Args:
+            embeddings: Mapping of cache keys to embedding vectors
+
+        Returns:
+            Dictionary containing success status and message
+        """
+        result = {"success": False, "message": ""}
+
+        try:
+            buffer = io.BytesIO()
+            np.savez(
+                buffer,
+                keys=np.array(list(embeddings.keys()), dtype=str),
+                vectors=np.array(list(embeddings.values()), dtype=np.float32),
+            )
+
+            blob = self.storage_client.bucket(self.storage_name).blob(self.blob_name)
+            blob.upload_from_string(
+                buffer.getvalue(), content_type="application/octet-stream"
+            )
+
+            result["success"] = True
+            result["message"] = f"Saved {len(embeddings)} embeddings."
+
+        except Exception as e:
+            result["message"] = f"Error saving embedding cache: {str(e)}"
+
+        return result
@@ -1,8 +1,71 @@
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
-from typing import Any, Dict, List, Optional, Set
-
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+import httpx
+import requests
 from atlassian import Confluence
+from cachetools import TTLCache
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Largest page size the Confluence CQL search returns; larger limits are capped
+CQL_MAX_BATCH_SIZE = 100
+
+# Child listings are reused within a sync, but warm instances must not carry
+# them over to later syncs, which have to see pages added or moved since
+CHILDREN_CACHE_SIZE = 8192
+CHILDREN_CACHE_TTL_SECONDS = 15 * 60
+
+
+def _is_transient_error(error: BaseException) -> bool:
+    """
+    Check whether a failed Confluence request is worth retrying.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True for connection errors and timeouts of the sync and async clients
+        and for 429/5xx responses, False otherwise
+    """
+    if isinstance(
+        error, (httpx.TransportError, requests.ConnectionError, requests.Timeout)
+    ):
+        return True
+
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        response = error.response
+        return response is not None and response.status_code in TRANSIENT_STATUS_CODES
+
+    return False
+
+
+# Retries idempotent Confluence requests with exponential backoff
+_retry_transient = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.5, max=10),
+    retry=retry_if_exception(_is_transient_error),
+    reraise=True,
+)
 
 
 class ConfluenceFetcher:
@@ -13,6 +76,11 @@ class ConfluenceFetcher:
     from Confluence, with support for parallel processing and caching.
     """
 
+    _children_cache: TTLCache = TTLCache(
+        maxsize=CHILDREN_CACHE_SIZE, ttl=CHILDREN_CACHE_TTL_SECONDS
+    )
+    _children_cache_lock = threading.Lock()
+
     def __init__(self, confluence_client: Confluence, max_workers: int = 5):
         """
         Initialize the Confluence fetcher.
@@ -23,14 +91,48 @@ class ConfluenceFetcher:
         """
         self.confluence = confluence_client
         self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self) -> None:
+        """
+        Shut down the fetcher's thread pool.
+
+        Warm function instances create a fetcher for every invocation, so
+        its pool must be shut down once the fetcher is no longer needed. The
+        fetcher can be used as a context manager, which closes it on exit.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ConfluenceFetcher":
+        """
+        Enter the context of the fetcher.
+
+        Returns:
+            The fetcher itself
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Close the fetcher when its context is left.
+
+        Args:
+            exc_info: Exception type, value and traceback, if any
+        """
+        self.close()
 
-    @lru_cache(maxsize=128)
     def get_page_children(
         self, page_id: str, batch_size: int = 100
     ) -> List[Dict[str, Any]]:
         """
         Get all child pages of a given page with caching.
 
+        The cache is shared by all fetcher instances and keyed by the Confluence
+        URL and the page ID. It holds the children of at most
+        CHILDREN_CACHE_SIZE pages, each for CHILDREN_CACHE_TTL_SECONDS.
+        Children are paginated until an empty batch, since the server may
+        return fewer than batch_size per call.
+
         Args:
             page_id: ID of the parent page
             batch_size: Number of results to fetch per API call
@@ -38,12 +140,18 @@ class ConfluenceFetcher:
         Returns:
             List of child page objects
         """
+        cache_key = (self.confluence.url, page_id)
+        with self._children_cache_lock:
+            cached_children = self._children_cache.get(cache_key)
+        if cached_children is not None:
+            return cached_children
+
         try:
             children = []
             start = 0
 
             while True:
-                batch = self.confluence.get_page_child_by_type(
+                batch = _retry_transient(self.confluence.get_page_child_by_type)(
                     page_id, type="page", start=start, limit=batch_size
                 )
 
@@ -53,146 +161,601 @@ class ConfluenceFetcher:
                 children.extend(batch)
                 start += len(batch)
 
-                if len(batch) < batch_size:
-                    break
-
-            return children
+            with self._children_cache_lock:
+                return self._children_cache.setdefault(cache_key, children)
         except Exception as e:
             print(f"Error fetching children of page {page_id}: {e}")
             raise
 
-    def get_page_tree(self, root_id: str) -> Set[str]:
+    def get_page_tree(
+        self, root_id: str, visited: Optional[Set[str]] = None
+    ) -> Set[str]:
         """
         Get all page IDs in the tree rooted at the given page.
 
-        Uses breadth-first search to traverse the page hierarchy.
-
         Args:
             root_id: ID of the root page
+            visited: Optional set of page IDs already traversed by earlier calls.
+                Their subtrees are not requested again, and the set is updated
+                with the pages found by this call.
 
         Returns:
             Set of all page IDs in the tree
         """
-        result = {root_id}
-        queue = [root_id]
+        return self._get_page_trees([root_id], visited)
 
-        while queue:
-            current_batch = queue[: min(len(queue), self.max_workers * 2)]
-            queue = queue[len(current_batch) :]
+    def _get_page_trees(
+        self, root_ids: Collection[str], visited: Optional[Set[str]] = None
+    ) -> Set[str]:
+        """
+        Get all page IDs in the trees rooted at the given pages.
 
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                child_results = list(
-                    executor.map(self.get_page_children, current_batch)
-                )
+        Descendants are resolved with a single paginated CQL search. Servers
+        without CQL support fall back to crawling the trees page by page.
 
-            for children in child_results:
-                child_ids = [child["id"] for child in children]
-                queue.extend(child_ids)
-                result.update(child_ids)
+        Args:
+            root_ids: IDs of the root pages
+            visited: Optional set of page IDs already traversed by earlier calls
 
+        Returns:
+            Set of all page IDs in the trees
+        """
+        try:
+            result = set(root_ids) | self.get_descendants_cql(root_ids)
+        except Exception as e:
+            print(f"Error searching descendants with CQL, crawling page trees: {e}")
+            return self._crawl_page_trees(root_ids, visited)
+
+        if visited is not None:
+            visited.update(result)
         return result
 
-    def get_excluded_pages(self, exclude_roots: List[str]) -> Set[str]:
+    def get_descendants_cql(
+        self, root_ids: Collection[str], batch_size: int = 100
+    ) -> Set[str]:
         """
-        Get all page IDs that should be excluded based on root exclusion pages.
+        Get IDs of all pages descending from the given pages using CQL.
 
         Args:
-            exclude_roots: List of page IDs whose entire subtrees should be excluded
+            root_ids: IDs of the ancestor pages
+            batch_size: Number of results to fetch per API call
 
         Returns:
-            Set of page IDs to exclude
+            Set of descendant page IDs, not including the ancestors themselves
         """
-        if not exclude_roots:
-            return set()
+        ancestors = ", ".join(f'"{root_id}"' for root_id in root_ids)
+        cql = f"type = page and ancestor in ({ancestors})"
+
+        descendants = set()
+        for batch in self._iter_cql_batches(cql, batch_size):
+            descendants.update(batch)
+
+        return descendants
+
+    def _iter_cql_batches(self, cql: str, batch_size: int) -> Iterator[List[str]]:
+        """
+        Yield IDs of the content matching a CQL query one result page at a time.
+
+        The server may return fewer results than requested, so results are
+        paginated until a page is empty or has no next link, rather than until
+        a page comes back short.
+
+        Args:
+            cql: CQL query
+            batch_size: Number of results to fetch per API call, capped at
+                CQL_MAX_BATCH_SIZE
+
+        Yields:
+            Lists of content IDs, one per API call
+        """
+        limit = min(batch_size, CQL_MAX_BATCH_SIZE)
+        start = 0
+
+        while True:
+            response = _retry_transient(self.confluence.cql)(
+                cql, start=start, limit=limit
+            )
+            batch = response.get("results", []) if response else []
+
+            if not batch:
+                break
 
-        result = set()
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            tree_results = executor.map(self.get_page_tree, exclude_roots)
+            yield [item["content"]["id"] for item in batch]
+            start += len(batch)
 
-        for tree in tree_results:
-            result.update(tree)
+            if not response.get("_links", {}).get("next"):
+                break
+
+    def _crawl_page_trees(
+        self, root_ids: Collection[str], visited: Optional[Set[str]] = None
+    ) -> Set[str]:
+        """
+        Crawl the trees rooted at the given pages one page at a time.
+
+        Traverses the page hierarchy on the fetcher's shared thread pool. Children
+        of a page are requested as soon as its response arrives, without waiting
+        for the rest of its level to finish. Pages in visited are not expanded
+        again, so overlapping trees cost no duplicate requests.
+
+        Args:
+            root_ids: IDs of the root pages
+            visited: Optional set of page IDs already traversed by earlier calls
+
+        Returns:
+            Set of all page IDs in the trees
+        """
+        if visited is None:
+            visited = set()
+
+        result = set(root_ids)
+        in_flight = {
+            self._executor.submit(self.get_page_children, root_id)
+            for root_id in result
+            if root_id not in visited
+        }
+        visited.update(result)
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                for child in future.result():
+                    child_id = child["id"]
+                    if child_id in visited:
+                        continue
+                    visited.add(child_id)
+                    result.add(child_id)
+                    in_flight.add(
+                        self._executor.submit(self.get_page_children, child_id)
+                    )
 
         return result
 
-    def get_all_space_pages(
-        self,
-        space: str,
-        exclude_roots: Optional[List[str]] = None,
-        batch_size: int = 100,
-    ) -> List[str]:
+    def get_excluded_pages(self, exclude_roots: Collection[str]) -> FrozenSet[str]:
         """
-        Get all page IDs from a space, with optional exclusions.
+        Get all page IDs that should be excluded based on root exclusion pages.
 
         Args:
-            space: Space key
-            exclude_roots: Optional list of page IDs to exclude (including their children)
-            batch_size: Number of results to fetch per API call
+            exclude_roots: Page IDs whose entire subtrees should be excluded
 
         Returns:
-            List of page IDs in the space, excluding any specified subtrees
+            Frozen set of page IDs to exclude
         """
+        if not exclude_roots:
+            return frozenset()
+
+        return frozenset(self._get_page_trees(exclude_roots, visited=set()))
+
+    def iter_space_page_batches(
+        self, space: str, batch_size: int = 500
+    ) -> Iterator[List[str]]:
+        """
+        Yield page IDs from a space one listing batch at a time.
+
+        The server may cap the page size below batch_size, so the listing only
+        ends with an empty batch, never with a short one.
+
+        Args:
+            space: Space key
+            batch_size: Number of results to fetch per API call
 
-        all_pages = []
+        Yields:
+            Lists of page IDs, one per API call
+        """
         start = 0
 
         while True:
             try:
-                batch = self.confluence.get_all_pages_from_space(
+                batch = _retry_transient(self.confluence.get_all_pages_from_space)(
                     space=space,
                     start=start,
                     limit=batch_size,
                     status="current",
                     expand=None,
                 )
+            except Exception as e:
+                print(f"Error fetching pages from space {space}: {e}")
+                raise
 
-                if not batch:
-                    break
+            if not batch:
+                break
 
-                all_pages.extend(batch)
-                start += len(batch)
+            yield [page["id"] for page in batch]
+            start += len(batch)
 
-                if len(batch) < batch_size:
-                    break
+    def iter_space_page_batches_cql(
+        self, space: str, exclude_roots: Collection[str], batch_size: int = 100
+    ) -> Iterator[List[str]]:
+        """
+        Yield page IDs from a space with excluded subtrees filtered out by CQL.
 
-            except Exception as e:
-                print(f"Error fetching pages from space {space}: {e}")
-                raise
+        Args:
+            space: Space key
+            exclude_roots: Page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per API call, capped at
+                CQL_MAX_BATCH_SIZE
+
+        Yields:
+            Lists of page IDs, one per API call
+        """
+        roots = ", ".join(f'"{root_id}"' for root_id in exclude_roots)
+        cql = (
+            f'space = "{space}" and type = page'
+            f" and id not in ({roots}) and ancestor not in ({roots})"
+        )
+
+        yield from self._iter_cql_batches(cql, batch_size)
+
+    def _iter_filtered_page_batches(
+        self,
+        space: str,
+        exclude_roots: Optional[Collection[str]],
+        batch_size: int,
+    ) -> Iterator[List[str]]:
+        """
+        Yield page IDs from a space one batch at a time, without excluded subtrees.
+
+        Excluded subtrees are filtered server-side with CQL, so their pages are
+        never listed. If the CQL search fails before yielding anything, the whole
+        space is listed and the excluded pages are dropped client-side.
+
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per API call
+
+        Yields:
+            Lists of page IDs, one per API call
+        """
+        if not exclude_roots:
+            yield from self.iter_space_page_batches(space, batch_size)
+            return
+
+        batches = self.iter_space_page_batches_cql(space, exclude_roots, batch_size)
+        try:
+            first_batch = next(batches, None)
+        except Exception as e:
+            print(f"Error listing space {space} with CQL, filtering client-side: {e}")
+        else:
+            if first_batch is not None:
+                yield first_batch
+                yield from batches
+            return
 
-        page_ids = {page["id"] for page in all_pages if page.get("status") == "current"}
+        excluded_ids = self.get_excluded_pages(exclude_roots)
+        for batch in self.iter_space_page_batches(space, batch_size):
+            yield [page_id for page_id in batch if page_id not in excluded_ids]
 
-        if exclude_roots:
-            excluded_ids = self.get_excluded_pages(exclude_roots)
-            page_ids -= excluded_ids
-        return list(page_ids)
+    def get_all_space_pages(
+        self,
+        space: str,
+        exclude_roots: Optional[Collection[str]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[str]:
+        """
+        Get all page IDs from a space, with optional exclusions.
+
+        IDs are yielded as each listing batch arrives, so page objects of the
+        listing are never held in memory all at once.
 
-    def get_pages_content(self, page_ids: List[str]) -> List[Dict[str, Any]]:
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per API call
+
+        Yields:
+            Page IDs in the space, excluding any specified subtrees
         """
-        Fetch content for multiple pages in parallel.
+        seen_ids: Set[str] = set()
+
+        for batch in self._iter_filtered_page_batches(space, exclude_roots, batch_size):
+            for page_id in batch:
+                if page_id in seen_ids:
+                    continue
+                seen_ids.add(page_id)
+                yield page_id
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """
+        Create an async HTTP client for the Confluence REST API.
+
+        Returns:
+            Pooled async client authenticated like the Confluence client
+        """
+        auth = (
+            (self.confluence.username, self.confluence.password)
+            if self.confluence.username and self.confluence.password
+            else None
+        )
+
+        return httpx.AsyncClient(
+            base_url=self.confluence.url,
+            auth=auth,
+            timeout=self.confluence.timeout,
+            verify=self.confluence.verify_ssl,
+            limits=httpx.Limits(max_connections=100),
+        )
+
+    @_retry_transient
+    async def _afetch_page(
+        self, client: httpx.AsyncClient, page_id: str
+    ) -> Dict[str, Any]:
+        """
+        Fetch a single page with its storage body.
 
         Args:
-            page_ids: Set of page IDs to fetch
+            client: Async client created by _async_client
+            page_id: ID of the page to fetch
 
         Returns:
-            List of page objects with content
+            Page object with content
         """
+        response = await client.get(
+            f"rest/api/content/{page_id}", params={"expand": "body.storage"}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _completed_pages(
+        tasks: Set["asyncio.Task[Dict[str, Any]]"],
+        failed_pages: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect results of completed page fetches, reporting failed ones.
+
+        Args:
+            tasks: Completed page fetch tasks, named by their page IDs
+            failed_pages: Optional list that collects the IDs of pages that
+                could not be fetched
 
+        Returns:
+            List of page objects with content
+        """
         results = []
+        for task in tasks:
+            try:
+                results.append(task.result())
+            except Exception as e:
+                print(f"Error fetching page {task.get_name()} content: {e}")
+                if failed_pages is not None:
+                    failed_pages.append(task.get_name())
+
+        return results
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-            for page_id in page_ids:
-                futures.append(
-                    executor.submit(
-                        self.confluence.get_page_by_id,
-                        page_id=page_id,
-                        expand="body.storage",
+    async def _aiter_fetched_pages(
+        self,
+        page_ids: AsyncIterator[str],
+        failed_pages: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch pages for a stream of IDs, yielding each page as soon as it arrives.
+
+        At most max_workers * 10 requests are in flight, and new requests are
+        only started once earlier pages have been handed to the consumer. Memory
+        therefore stays bounded by that window instead of the number of pages.
+
+        Args:
+            page_ids: Async iterator of page IDs to fetch
+            failed_pages: Optional list that collects the IDs of pages that
+                could not be fetched
+
+        Yields:
+            Page objects with content, in completion order
+        """
+        window = self.max_workers * 10
+        pending: Set["asyncio.Task[Dict[str, Any]]"] = set()
+
+        async with self._async_client() as client:
+            try:
+                async for page_id in page_ids:
+                    pending.add(
+                        asyncio.create_task(
+                            self._afetch_page(client, page_id), name=page_id
+                        )
                     )
-                )
 
-            for future in futures:
+                    if len(pending) >= window:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for page in self._completed_pages(done, failed_pages):
+                            yield page
+
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for page in self._completed_pages(done, failed_pages):
+                        yield page
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    async def _aiter_ids(page_ids: Iterable[str]) -> AsyncIterator[str]:
+        """
+        Wrap page IDs into an async iterator.
+
+        Args:
+            page_ids: Page IDs
+
+        Yields:
+            Page IDs
+        """
+        for page_id in page_ids:
+            yield page_id
+
+    async def _aiter_space_page_ids(
+        self, space: str, exclude_roots: Optional[Collection[str]], batch_size: int
+    ) -> AsyncIterator[str]:
+        """
+        List page IDs of a space without blocking the event loop.
+
+        Listing calls, including the exclusion filtering, run in a worker thread.
+
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per listing API call
+
+        Yields:
+            Page IDs in the space, excluding any specified subtrees
+        """
+        batches = self._iter_filtered_page_batches(space, exclude_roots, batch_size)
+        seen_ids: Set[str] = set()
+
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+
+            for page_id in batch:
+                if page_id in seen_ids:
+                    continue
+                seen_ids.add(page_id)
+                yield page_id
+
+    @staticmethod
+    def _iterate(pages: AsyncIterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Consume an async page iterator from synchronous code.
+
+        Args:
+            pages: Async iterator of pages
+
+        Yields:
+            Page objects with content
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
                 try:
-                    results.append(future.result())
-                except Exception as e:
-                    print(f"Error fetching page content: {e}")
+                    yield loop.run_until_complete(anext(pages))
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def aiter_pages_content(
+        self, page_ids: Iterable[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch content for multiple pages concurrently from a single event loop.
 
-        return results
+        Pages are requested directly from the Confluence REST API through a pooled
+        async HTTP client instead of a thread per request, and are yielded as
+        soon as each response arrives.
+
+        Args:
+            page_ids: Page IDs to fetch
+
+        Returns:
+            Async iterator of page objects with content, in completion order
+        """
+        return self._aiter_fetched_pages(self._aiter_ids(page_ids))
+
+    async def aget_pages_content(self, page_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch content for multiple pages concurrently from a single event loop.
+
+        Args:
+            page_ids: Page IDs to fetch
+
+        Returns:
+            List of page objects with content
+        """
+        return [page async for page in self.aiter_pages_content(page_ids)]
+
+    def get_pages_content(self, page_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch content for multiple pages in parallel, yielding pages as they arrive.
+
+        Args:
+            page_ids: Page IDs to fetch
+
+        Yields:
+            Page objects with content, in completion order
+        """
+        return self._iterate(self.aiter_pages_content(page_ids))
+
+    def aiter_space_pages_content(
+        self,
+        space: str,
+        exclude_roots: Optional[Collection[str]] = None,
+        batch_size: int = 500,
+        failed_pages: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch content for all pages of a space, with optional exclusions.
+
+        Listing the space and fetching page content are overlapped: content
+        requests start as soon as their listing batch arrives, while the next
+        batch is listed in a worker thread.
+
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per listing API call
+            failed_pages: Optional list that collects the IDs of pages that
+                could not be fetched
+
+        Returns:
+            Async iterator of page objects with content, excluding any specified subtrees
+        """
+        return self._aiter_fetched_pages(
+            self._aiter_space_page_ids(space, exclude_roots, batch_size), failed_pages
+        )
+
+    async def aget_space_pages_content(
+        self,
+        space: str,
+        exclude_roots: Optional[Collection[str]] = None,
+        batch_size: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch content for all pages of a space, with optional exclusions.
+
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per listing API call
+
+        Returns:
+            List of page objects with content, excluding any specified subtrees
+        """
+        return [
+            page
+            async for page in self.aiter_space_pages_content(
+                space, exclude_roots, batch_size
+            )
+        ]
+
+    def get_space_pages_content(
+        self,
+        space: str,
+        exclude_roots: Optional[Collection[str]] = None,
+        batch_size: int = 500,
+        failed_pages: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch content for all pages of a space, yielding pages as they arrive.
+
+        Args:
+            space: Space key
+            exclude_roots: Optional page IDs to exclude (including their children)
+            batch_size: Number of results to fetch per listing API call
+            failed_pages: Optional list that collects the IDs of pages that
+                could not be fetched
+
+        Yields:
+            Page objects with content, excluding any specified subtrees
+        """
+        return self._iterate(
+            self.aiter_space_pages_content(
+                space, exclude_roots, batch_size, failed_pages
+            )
+        )
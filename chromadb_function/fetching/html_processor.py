@@ -1,31 +1,373 @@
+import hashlib
 import json
+import multiprocessing
 import re
+import threading
 import time
-import uuid
-from functools import lru_cache
-from typing import Any, Callable, Dict, List, Optional, Union
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from html import escape
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sized,
+    Tuple,
+    Union,
+)
 
 from atlassian import Confluence
 from bs4 import BeautifulSoup, NavigableString, Tag
+from cachetools import LRUCache, TLRUCache
+from lxml import etree, html as lxml_html
+
+HTML_PARSER = "lxml"
+
+# lxml's HTML parser drops CDATA sections, which Confluence uses for code blocks
+_CDATA_PATTERN = re.compile(r"<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
+_SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_SPLIT_PATTERN = re.compile(r"\n\s*\n")
+_HEADER_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+# Tags whose boundaries separate words, so unwrapping them must leave whitespace
+_BLOCK_TAGS = frozenset(
+    {
+        "p",
+        "div",
+        "br",
+        "hr",
+        "pre",
+        "blockquote",
+        "section",
+        "dl",
+        "dt",
+        "dd",
+        "caption",
+        "ac:structured-macro",
+        "ac:parameter",
+        "ac:rich-text-body",
+        "ac:plain-text-body",
+        "ac:layout",
+        "ac:layout-section",
+        "ac:layout-cell",
+        "ac:task",
+        "ac:task-body",
+    }
+)
+# Opening tags of the links handled by HtmlCleaner
+_LINK_TAG_PATTERN = re.compile(r"<(?:ac:link|a)[\s/>]", re.IGNORECASE)
+# Whole link elements; neither kind nests inside itself
+_LINK_ELEMENT_PATTERN = re.compile(
+    r"<ac:link[^>]*/>|<ac:link[\s>].*?</ac:link>|<a[\s>].*?</a>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _make_soup(html: str) -> BeautifulSoup:
+    """
+    Parse HTML with the lxml parser, keeping the text of CDATA sections.
+
+    Args:
+        html: HTML content to parse
+
+    Returns:
+        Parsed BeautifulSoup object
+    """
+    html = _CDATA_PATTERN.sub(lambda match: escape(match.group(1), quote=False), html)
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def _extract_text(html: str) -> str:
+    """
+    Extract the text of HTML, joining stripped text nodes with single spaces.
+
+    Works on the lxml tree directly, which is considerably faster than building
+    a BeautifulSoup tree only to call get_text on it. The output matches
+    BeautifulSoup's get_text(separator=" ", strip=True). Text without markup
+    or entities is returned as is, without parsing.
+
+    Args:
+        html: HTML content to extract text from
+
+    Returns:
+        Text content of the HTML
+    """
+    if "<" not in html and "&" not in html:
+        return html.strip()
+
+    html = _CDATA_PATTERN.sub(lambda match: escape(match.group(1), quote=False), html)
+    if not html.strip():
+        return ""
+
+    try:
+        root = lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        return ""
+
+    etree.strip_elements(root, "script", "style", "template", with_tail=False)
+    return " ".join(text for text in map(str.strip, root.itertext()) if text)
+
+
+def _link_expiry(key: tuple, value: tuple, now: float) -> float:
+    """
+    Get the time a resolved link expires from the link caches.
+
+    Args:
+        key: Cache key of the link
+        value: Cached link, ending with the time it was resolved
+        now: Current time
+
+    Returns:
+        Time after which the link is resolved again
+    """
+    return value[-1] + ConfluenceResolver.link_max_age_seconds
 
 
 class ConfluenceResolver:
     """Implementation of LinkResolver for Confluence."""
 
-    def __init__(self, confluence_client: Confluence):
+    # Number of page titles looked up with a single CQL search
+    CQL_BATCH_SIZE = 50
+
+    # Age after which a resolved link is looked up again, so renamed or moved
+    # pages are eventually resolved to their new links
+    link_max_age_seconds: float = 7 * 24 * 60 * 60
+
+    # Resolved links are shared by all resolvers, keyed by the Confluence base
+    # URL. Each link keeps the time it was resolved, also across exports.
+    _page_link_cache: TLRUCache = TLRUCache(
+        maxsize=8192, ttu=_link_expiry, timer=time.time
+    )
+    _user_link_cache: TLRUCache = TLRUCache(
+        maxsize=8192, ttu=_link_expiry, timer=time.time
+    )
+    _cache_lock = threading.Lock()
+    # Links resolved since the last drain_new_links or export_links call
+    _new_links: Dict[str, List[list]] = {"pages": [], "users": []}
+
+    def __init__(
+        self,
+        confluence_client: Confluence,
+        max_workers: int = 8,
+    ):
         """
         Initialize the ConfluenceResolver with a Confluence client.
 
         Args:
             confluence_client: Authenticated Confluence client instance
+            max_workers: Maximum number of links resolved concurrently
         """
         self.confluence_client = confluence_client
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    def close(self) -> None:
+        """
+        Shut down the resolver's thread pool.
+
+        The resolved links stay in the shared caches.
+        """
+        self._executor.shutdown()
+
+    def resolve_links(
+        self, page_refs: Iterable[Tuple[str, str]], account_ids: Iterable[str]
+    ) -> None:
+        """
+        Resolve page and user links concurrently, filling the resolver caches.
+
+        Later calls to resolve_page_link and resolve_user_link with the same
+        arguments return the cached results without a request. Pages are
+        looked up by title with batched CQL searches first, and only the pages
+        those searches miss are resolved one by one.
+
+        Args:
+            page_refs: Pairs of (page title, space key) to resolve
+            account_ids: Confluence user account IDs to resolve
+        """
+        url = self.confluence_client.url
+        with self._cache_lock:
+            missing_refs = {
+                (title, space_key or "QD")
+                for title, space_key in page_refs
+                if (url, title, space_key or "QD") not in self._page_link_cache
+            }
+
+        by_space: Dict[str, List[str]] = {}
+        for title, space_key in missing_refs:
+            by_space.setdefault(space_key, []).append(title)
+
+        futures = [
+            self._executor.submit(
+                self._resolve_page_links_cql,
+                space_key,
+                titles[start : start + self.CQL_BATCH_SIZE],
+            )
+            for space_key, titles in by_space.items()
+            for start in range(0, len(titles), self.CQL_BATCH_SIZE)
+        ]
+        wait(futures)
+
+        with self._cache_lock:
+            unresolved_refs = [
+                (title, space_key)
+                for title, space_key in missing_refs
+                if (url, title, space_key) not in self._page_link_cache
+            ]
+
+        futures = [
+            self._executor.submit(self.resolve_page_link, title, space_key)
+            for title, space_key in unresolved_refs
+        ]
+        futures.extend(
+            self._executor.submit(self.resolve_user_link, account_id)
+            for account_id in set(account_ids)
+        )
+        wait(futures)
+
+    def _resolve_page_links_cql(self, space_key: str, titles: List[str]) -> None:
+        """
+        Resolve current pages of a space by title with a single CQL search.
+
+        Pages that are found are cached like resolve_page_link results. Titles
+        that are not found, or the whole batch if the search fails, are left
+        for resolve_page_link.
+
+        Args:
+            space_key: Space key where the pages are located
+            titles: Page titles to look up
+        """
+        quoted_titles = ", ".join(
+            '"' + title.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for title in titles
+        )
+        cql = f'type = page and space = "{space_key}" and title in ({quoted_titles})'
+
+        try:
+            response = self.confluence_client.cql(cql, limit=len(titles))
+        except Exception as e:
+            print(f"Error resolving page links with CQL: {e}")
+            return
+
+        if not response:
+            return
+
+        base_url = response.get("_links", {}).get("base", "")
+        wanted_titles = set(titles)
+        resolved_at = time.time()
+        new_rows = []
+
+        for item in response.get("results", []):
+            content = item.get("content", {})
+            title = content.get("title")
+            webui = content.get("_links", {}).get("webui")
+
+            if title in wanted_titles and webui and content.get("status") == "current":
+                new_rows.append(
+                    [
+                        self.confluence_client.url,
+                        title,
+                        space_key,
+                        base_url + webui,
+                        resolved_at,
+                    ]
+                )
+
+        with self._cache_lock:
+            for url, title, space_key, page_link, resolved_at in new_rows:
+                self._page_link_cache[(url, title, space_key)] = (
+                    title,
+                    page_link,
+                    resolved_at,
+                )
+            self._new_links["pages"].extend(new_rows)
+
+    @classmethod
+    def export_links(cls, include_missing: bool = False) -> Dict[str, List[list]]:
+        """
+        Export all cached links in a JSON-serializable form.
+
+        The export includes every newly resolved link, so the record of new
+        links is cleared as well. Expired links are left out.
+
+        Args:
+            include_missing: Whether to export pages that were not found. They
+                are worth sharing within a run, but not worth saving, as the
+                pages may be created later.
+
+        Returns:
+            Dictionary with "pages" as [base URL, title, space key, link,
+            resolved at] rows and "users" as [base URL, account ID, user name,
+            resolved at] rows
+        """
+        with cls._cache_lock:
+            cls._new_links = {"pages": [], "users": []}
+            return {
+                "pages": [
+                    [url, title, space_key, page_link, resolved_at]
+                    for (url, title, space_key), (_, page_link, resolved_at) in (
+                        cls._page_link_cache.items()
+                    )
+                    if include_missing or page_link is not None
+                ],
+                "users": [
+                    [url, account_id, user_link, resolved_at]
+                    for (url, account_id), (user_link, resolved_at) in (
+                        cls._user_link_cache.items()
+                    )
+                ],
+            }
+
+    @classmethod
+    def import_links(cls, links: Dict[str, List[list]]) -> None:
+        """
+        Fill the caches with links exported by export_links or drain_new_links.
+
+        Links older than link_max_age_seconds are skipped.
+
+        Args:
+            links: Dictionary with "pages" and "users" rows as exported
+        """
+        with cls._cache_lock:
+            for url, title, space_key, page_link, resolved_at in links.get("pages", []):
+                cls._page_link_cache[(url, title, space_key)] = (
+                    title,
+                    page_link,
+                    resolved_at,
+                )
+            for url, account_id, user_link, resolved_at in links.get("users", []):
+                cls._user_link_cache[(url, account_id)] = (user_link, resolved_at)
+
+    @classmethod
+    def drain_new_links(cls) -> Dict[str, List[list]]:
+        """
+        Return the links resolved since the last call and clear the record.
+
+        Worker processes use this to hand their lookups back to the parent.
+
+        Returns:
+            Dictionary with "pages" and "users" rows in the export_links format
+        """
+        with cls._cache_lock:
+            new_links = cls._new_links
+            cls._new_links = {"pages": [], "users": []}
+        return new_links
 
-    @lru_cache(maxsize=1024)
     def resolve_page_link(self, page_title: str, space_key: str) -> tuple:
         """
         Resolve a Confluence page link by its title and space key.
 
+        Results are cached across resolver instances until they are
+        link_max_age_seconds old. Failed lookups are not cached, so they are
+        retried on the next call.
+
         Args:
             page_title: Title of the Confluence page
             space_key: Space key where the page is located
@@ -36,75 +378,163 @@ class ConfluenceResolver:
         if not space_key:
             space_key = "QD"
 
+        cache_key = (self.confluence_client.url, page_title, space_key)
+        with self._cache_lock:
+            cached_link = self._page_link_cache.get(cache_key)
+        if cached_link is not None:
+            return cached_link[:2]
+
         try:
             page = self.confluence_client.get_page_by_title(
                 space=space_key, title=page_title
             )
 
             if not page or page["status"] != "current":
-                return page_title, None
-
-            page = self.confluence_client.get_page_by_id(page_id=page["id"])
-            page_link = page["_links"]["base"] + page["_links"]["webui"]
-
-            return page_title, page_link
+                page_link = None
+            else:
+                page = self.confluence_client.get_page_by_id(page_id=page["id"])
+                page_link = page["_links"]["base"] + page["_links"]["webui"]
         except Exception as e:
             print(f"Error resolving page link: {e}")
             return page_title, None
 
-    @lru_cache(maxsize=1024)
+        resolved_at = time.time()
+        with self._cache_lock:
+            self._page_link_cache[cache_key] = (page_title, page_link, resolved_at)
+            self._new_links["pages"].append([*cache_key, page_link, resolved_at])
+        return page_title, page_link
+
     def resolve_user_link(self, account_id: str) -> str:
         """
         Resolve a Confluence user link by account ID.
 
+        Results are cached across resolver instances until they are
+        link_max_age_seconds old. Failed lookups are not cached, so they are
+        retried on the next call.
+
         Args:
             account_id: Confluence user account ID
 
         Returns:
             Formatted string with user name, or account ID if resolution fails
         """
+        cache_key = (self.confluence_client.url, account_id)
+        with self._cache_lock:
+            cached_user = self._user_link_cache.get(cache_key)
+        if cached_user is not None:
+            return cached_user[0]
+
         try:
             user = self.confluence_client.get_user_details_by_accountid(
                 accountid=account_id
             )
-
-            if not user:
-                return f"User account_id: {account_id}"
-
-            return f"{user['publicName']}"
+            user_link = (
+                f"{user['publicName']}" if user else f"User account_id: {account_id}"
+            )
         except Exception as e:
             print(f"Error resolving user link: {e}")
             return f"User account_id: {account_id}"
 
+        resolved_at = time.time()
+        with self._cache_lock:
+            self._user_link_cache[cache_key] = (user_link, resolved_at)
+            self._new_links["users"].append([*cache_key, user_link, resolved_at])
+        return user_link
+
+
+def _cache_key(text: str) -> bytes:
+    """
+    Get the key of a text in the token count caches.
+
+    The caches hold digests rather than the texts themselves, so long texts
+    and HTML fragments do not stay in memory for as long as their counts are
+    cached.
+
+    Args:
+        text: The input text
+
+    Returns:
+        16-byte BLAKE2b digest of the text
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
 
 class TokenCounter:
     """Counts tokens in text using a provided tokenizer function."""
 
-    def __init__(self, tokenizer: Callable[[str], int]):
+    def __init__(self, tokenizer: Callable[[str], int], cache_size: int = 65536):
         """
         Initialize the TokenCounter with a tokenizer function.
 
         Args:
             tokenizer: A function that converts a string to token count
+            cache_size: Maximum number of token counts kept in the LRU cache
         """
         self.tokenizer = tokenizer
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
 
     def count_tokens(self, text: str) -> int:
         """
         Count tokens in text using the provided tokenizer.
 
+        Counts are cached, so repeated strings such as headers and overlap
+        text are tokenized only once.
+
         Args:
             text: The input text to tokenize and count
 
         Returns:
             Number of tokens in the text
         """
-        return self.tokenizer(text)
+        key = _cache_key(text)
+        tokens = self._cache.get(key)
+        if tokens is None:
+            tokens = self._cache[key] = self.tokenizer(text)
+        return tokens
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens in several texts at once.
+
+        Uses the tokenizer's count_batch method when it has one, so the texts
+        are tokenized in as few calls as possible. Otherwise each text is
+        counted separately.
+
+        Args:
+            texts: The input texts to tokenize and count
+
+        Returns:
+            Number of tokens in each text, in input order
+        """
+        if not texts:
+            return []
+
+        count_batch = getattr(self.tokenizer, "count_batch", None)
+        if count_batch is None:
+            return [self.count_tokens(text) for text in texts]
+
+        keys = [_cache_key(text) for text in texts]
+        counts = [self._cache.get(key) for key in keys]
+        missing = {
+            key: text for key, text, count in zip(keys, texts, counts) if count is None
+        }
+        if not missing:
+            return counts
+
+        counted = dict(zip(missing, count_batch(list(missing.values()))))
+        self._cache.update(counted)
+
+        return [
+            counted[key] if count is None else count for key, count in zip(keys, counts)
+        ]
 
 
 class HtmlCleaner:
     """Cleans and processes HTML content."""
 
+    # Invisible and control whitespace characters mapped to plain spaces
+    _WS_TRANSLATE = str.maketrans(dict.fromkeys("\xa0\u200b\t\n\r", " "))
+
     def __init__(self, confluence_resolver: ConfluenceResolver):
         """
         Initialize HtmlCleaner with a ConfluenceResolver.
@@ -113,11 +543,16 @@ class HtmlCleaner:
             confluence_resolver: A resolver for Confluence links and users
         """
         self.confluence_resolver = confluence_resolver
+        self._last_conversion: Optional[Tuple[str, Tuple[str, Dict[str, str]]]] = None
 
-    def clean_html(self, html: str, keep_tags: Optional[set] = None) -> str:
+    def clean_html(
+        self, html: str, keep_tags: Optional[AbstractSet[str]] = None
+    ) -> str:
         """
         Clean HTML by either keeping only specified tags or removing all tags.
 
+        Text without markup or entities is returned without parsing.
+
         Args:
             html: HTML content to clean
             keep_tags: Set of tag names to preserve (if None, all tags are removed)
@@ -126,42 +561,202 @@ class HtmlCleaner:
             Cleaned HTML or plain text
         """
         try:
-            soup = BeautifulSoup(html, "html.parser")
-
             if keep_tags:
+                if "<" not in html and "&" not in html:
+                    return html
+
+                soup = _make_soup(html)
                 for tag in soup.find_all():
                     if tag.name not in keep_tags:
+                        if tag.name in _BLOCK_TAGS:
+                            tag.insert_before("\n")
+                            tag.insert_after("\n")
                         tag.unwrap()
-                cleaned_html = soup.prettify()
+                cleaned_html = soup.decode()
+                soup.decompose()
             else:
-                cleaned_html = soup.get_text(separator=" ", strip=True)
-                cleaned_html = re.sub(r"[\xa0\u200b\t\n\r]+", " ", cleaned_html)
-                cleaned_html = re.sub(r"\s{2,}", " ", cleaned_html).strip()
+                cleaned_html = self._normalize_whitespace(_extract_text(html))
 
             return cleaned_html
         except Exception as e:
             print(f"Error cleaning HTML: {e}")
-            return re.sub(r"\s+", " ", html).strip()
+            return " ".join(html.split())
+
+    def _normalize_whitespace(self, text: str) -> str:
+        """
+        Collapse whitespace and invisible characters into single spaces.
+
+        Args:
+            text: Text to normalize
+
+        Returns:
+            Normalized text without leading or trailing whitespace
+        """
+        return " ".join(text.translate(self._WS_TRANSLATE).split())
+
+    def html_to_text(self, html: str) -> Dict[str, Any]:
+        """
+        Process links in HTML and convert it to clean text with a single parse.
+
+        Equivalent to process_links followed by clean_html without keep_tags,
+        but the HTML is parsed only once. The last conversion is kept, so a
+        fragment that is counted and then finalized as a chunk on its own is
+        not converted twice.
+
+        Args:
+            html: HTML content with links
+
+        Returns:
+            Dictionary with the cleaned text as page_content and the resolved
+            links as metadata
+        """
+        if self._last_conversion is None or self._last_conversion[0] != html:
+            self._last_conversion = (html, self._html_to_text(html))
+
+        page_content, metadata = self._last_conversion[1]
+        return {"page_content": page_content, "metadata": dict(metadata)}
+
+    def _html_to_text(self, html: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Convert HTML to clean text, resolving its links.
+
+        HTML without links skips the BeautifulSoup tree entirely. Otherwise
+        links are resolved and text is collected in a single walk over the
+        tree, without modifying it.
+
+        Args:
+            html: HTML content with links
+
+        Returns:
+            Tuple of the cleaned text and the resolved links
+        """
+        if not _LINK_TAG_PATTERN.search(html):
+            return self._normalize_whitespace(_extract_text(html)), {}
+
+        soup = _make_soup(html)
+
+        pieces: List[str] = []
+        metadata_confluence: Dict[str, str] = {}
+        metadata_html: Dict[str, str] = {}
+        self._collect_text(soup, pieces, metadata_confluence, metadata_html)
+        soup.decompose()
+
+        text = " ".join(pieces)
+        return self._normalize_whitespace(text), metadata_confluence | metadata_html
+
+    def _collect_text(
+        self,
+        tag: Tag,
+        pieces: List[str],
+        metadata_confluence: Dict[str, str],
+        metadata_html: Dict[str, str],
+    ) -> None:
+        """
+        Collect the stripped text of a tree, with links replaced by their text.
+
+        Consecutive text nodes and link replacements are stripped as one piece,
+        so the result matches replacing the links, calling smooth() and then
+        get_text(separator=" ", strip=True).
+
+        Args:
+            tag: Tag whose content is collected
+            pieces: List the non-empty text pieces are appended to
+            metadata_confluence: Mapping the resolved Confluence links are added to
+            metadata_html: Mapping the resolved standard links are added to
+        """
+        run: List[str] = []
+
+        def flush() -> None:
+            text = "".join(run).strip()
+            if text:
+                pieces.append(text)
+            run.clear()
+
+        for child in tag.children:
+            if isinstance(child, Tag):
+                if child.name == "ac:link":
+                    run.append(self._confluence_link_text(child, metadata_confluence))
+                elif child.name == "a":
+                    # Confluence links inside a standard link are replaced first,
+                    # so they show up in its text
+                    if child.find("ac:link"):
+                        metadata_confluence.update(
+                            self._process_confluence_links(child)
+                        )
+                    run.append(self._html_link_text(child, metadata_html))
+                else:
+                    flush()
+                    self._collect_text(
+                        child, pieces, metadata_confluence, metadata_html
+                    )
+            elif type(child) is NavigableString:
+                run.append(child)
+            else:
+                flush()
+
+        flush()
 
     def process_links(self, html: str) -> Dict[str, Any]:
         """
         Process all links in HTML, resolving references to pages and users.
 
+        Only the link elements are parsed. Each one is replaced in place in the
+        original HTML, so the rest of the document is neither parsed nor
+        re-serialized.
+
         Args:
             html: HTML content with links
 
         Returns:
             HTML with links replaced by text representations
         """
-        soup = BeautifulSoup(html, "html.parser")
+        if not _LINK_TAG_PATTERN.search(html):
+            return {"page_content": html, "metadata": {}}
+
+        metadata = {}
 
-        metadata_confluence = self._process_confluence_links(soup)
+        def replace_link(match: re.Match) -> str:
+            soup = _make_soup(match.group(0))
+            root = soup.body if soup.body else soup
+
+            metadata.update(self._process_confluence_links(root))
+            metadata.update(self._process_html_links(root))
 
-        metadata_html = self._process_html_links(soup)
+            return root.decode_contents()
 
-        metadata = metadata_confluence | metadata_html
+        page_content = _LINK_ELEMENT_PATTERN.sub(replace_link, html)
 
-        return {"page_content": str(soup), "metadata": metadata}
+        return {"page_content": page_content, "metadata": metadata}
+
+    def prefetch_links(self, soup: BeautifulSoup) -> None:
+        """
+        Resolve all Confluence links of a document concurrently ahead of time.
+
+        Processing the links afterwards, fragment by fragment, then hits the
+        resolver caches instead of making sequential requests.
+
+        Args:
+            soup: BeautifulSoup object containing the HTML with Confluence links
+        """
+        page_refs = []
+        account_ids = []
+
+        for tag in soup.find_all("ac:link"):
+            ripage_tag = tag.find("ri:page")
+            riuser_tag = tag.find("ri:user")
+
+            if ripage_tag:
+                page_refs.append(
+                    (
+                        ripage_tag.get("ri:content-title", ""),
+                        ripage_tag.get("ri:space-key", ""),
+                    )
+                )
+            elif riuser_tag:
+                account_ids.append(riuser_tag.get("ri:account-id", ""))
+
+        if page_refs or account_ids:
+            self.confluence_resolver.resolve_links(page_refs, account_ids)
 
     def _process_confluence_links(self, soup: BeautifulSoup) -> Dict[str, str]:
         """
@@ -172,61 +767,90 @@ class HtmlCleaner:
         """
         metadata = {}
         for tag in soup.find_all("ac:link"):
-            try:
-                ripage_tag = tag.find("ri:page")
-                riuser_tag = tag.find("ri:user")
-
-                if ripage_tag:
-                    title = ripage_tag.get("ri:content-title", "")
-                    space_key = ripage_tag.get("ri:space-key", "")
-                    page_title, page_link = self.confluence_resolver.resolve_page_link(
-                        title, space_key
-                    )
+            tag.replace_with(self._confluence_link_text(tag, metadata))
 
-                    metadata[page_title] = page_link
+        return metadata
 
-                    replacement = f"<[{page_title}]/>"
+    def _confluence_link_text(self, tag: Tag, metadata: Dict[str, str]) -> str:
+        """
+        Resolve a Confluence link to its text representation.
 
-                elif riuser_tag:
-                    account_id = riuser_tag.get("ri:account-id", "")
-                    replacement = self.confluence_resolver.resolve_user_link(account_id)
-                else:
-                    replacement = tag.get_text()
+        Args:
+            tag: The ac:link tag
+            metadata: Mapping the resolved page link is added to
 
-                tag.replace_with(replacement)
-            except Exception as e:
-                print(f"Error processing confluence link: {e}")
-                tag.replace_with(tag.get_text())
+        Returns:
+            Placeholder for page links, the user name for user links, and the
+            tag's text otherwise
+        """
+        try:
+            ripage_tag = tag.find("ri:page")
+            riuser_tag = tag.find("ri:user")
+
+            if ripage_tag:
+                title = ripage_tag.get("ri:content-title", "")
+                space_key = ripage_tag.get("ri:space-key", "")
+                page_title, page_link = self.confluence_resolver.resolve_page_link(
+                    title, space_key
+                )
 
-        return metadata
+                metadata[page_title] = page_link
+
+                return f"<[{page_title}]/>"
+
+            if riuser_tag:
+                account_id = riuser_tag.get("ri:account-id", "")
+                return self.confluence_resolver.resolve_user_link(account_id)
+
+            return tag.get_text()
+        except Exception as e:
+            print(f"Error processing confluence link: {e}")
+            return tag.get_text()
 
     def _process_html_links(self, soup: BeautifulSoup) -> Dict[str, str]:
         """
         Process standard HTML links in place.
 
+        Links whose text is a bare URL get a short label derived from the text
+        and target instead. Labels are the same on every run and unique across
+        pages, so placeholders from different pages never collide.
+
         Args:
             soup: BeautifulSoup object containing the HTML with standard links
         """
         metadata = {}
         for tag in soup.find_all("a"):
-            try:
-                href = tag.get("href", "")
-                text = tag.get_text().strip()
+            tag.replace_with(self._html_link_text(tag, metadata))
+        return metadata
 
-                if not text:
-                    tag.replace_with("")
-                    continue
+    def _html_link_text(self, tag: Tag, metadata: Dict[str, str]) -> str:
+        """
+        Resolve a standard link to its placeholder.
 
-                if text.startswith("http"):
-                    text = str(uuid.uuid4())
+        Args:
+            tag: The a tag
+            metadata: Mapping the link target is added to
 
-                replacement = f"<[{text}]/>"
-                tag.replace_with(replacement)
-                metadata[text] = href
-            except Exception as e:
-                print(f"Error processing html link: {e}")
-                tag.replace_with(tag.get_text().strip())
-        return metadata
+        Returns:
+            Placeholder for the link, or an empty string if it has no text
+        """
+        try:
+            href = tag.get("href", "")
+            text = tag.get_text().strip()
+
+            if not text:
+                return ""
+
+            if text.startswith("http"):
+                text = hashlib.blake2b(
+                    f"{text}\0{href}".encode(), digest_size=8
+                ).hexdigest()
+
+            metadata[text] = href
+            return f"<[{text}]/>"
+        except Exception as e:
+            print(f"Error processing html link: {e}")
+            return tag.get_text().strip()
 
 
 class DocumentChunker:
@@ -241,6 +865,7 @@ class DocumentChunker:
         token_counter: TokenCounter,
         chunk_token_limit: int = 512,
         overlap: float = 0.0,
+        cache_size: int = 4096,
     ):
         """
         Initialize the DocumentChunker with required components and settings.
@@ -250,20 +875,28 @@ class DocumentChunker:
             token_counter: Token counter component for measuring token counts
             chunk_token_limit: Maximum number of tokens per chunk
             overlap: Percentage of overlap between chunks (0.0-0.5)
+            cache_size: Maximum number of HTML fragment token counts kept in
+                the LRU cache
         """
         self.html_cleaner = html_cleaner
         self.token_counter = token_counter
         self.chunk_token_limit = chunk_token_limit
         self.overlap = min(max(0.0, overlap), 0.5)
+        self.overlap_size = int(self.chunk_token_limit * self.overlap)
 
         self.chunks = []
-        self.current_chunk = {"page_content": "", "metadata": {}}
+        self.current_chunk_parts: List[str] = []
+        self.current_chunk_tokens = 0
         self.last_chunk_content = None
+        self._html_token_cache: LRUCache = LRUCache(maxsize=cache_size)
 
     def count_tokens(self, html_string: str) -> int:
         """
         Count tokens in processed HTML string.
 
+        Counts are cached by a digest of the exact HTML, so a fragment that is
+        counted again while splitting skips link processing and cleaning.
+
         Args:
             html_string: Raw HTML string
 
@@ -274,18 +907,59 @@ class DocumentChunker:
         if not html_string or not html_string.strip():
             return 0
 
-        processed_chunk = self.html_cleaner.process_links(html_string)
-        processed_chunk["page_content"] = self.html_cleaner.clean_html(
-            processed_chunk["page_content"]
-        )
+        key = _cache_key(html_string)
+        tokens = self._html_token_cache.get(key)
+        if tokens is not None:
+            return tokens
+
+        processed_chunk = self.html_cleaner.html_to_text(html_string)
 
         if (
             not processed_chunk["page_content"]
             or not processed_chunk["page_content"].strip()
         ):
-            return 0
+            tokens = 0
+        else:
+            tokens = self.token_counter.count_tokens(processed_chunk["page_content"])
 
-        return self.token_counter.count_tokens(processed_chunk["page_content"])
+        self._html_token_cache[key] = tokens
+        return tokens
+
+    def count_tokens_batch(self, html_strings: List[str]) -> List[int]:
+        """
+        Count tokens in several processed HTML strings with batched tokenizer calls.
+
+        Only strings missing from the fragment cache are processed and counted.
+
+        Args:
+            html_strings: Raw HTML strings
+
+        Returns:
+            Token count of each string after processing, in input order
+        """
+        keys = [_cache_key(html_string) for html_string in html_strings]
+        counts = [self._html_token_cache.get(key) for key in keys]
+        missing = [index for index, count in enumerate(counts) if count is None]
+
+        texts = [
+            self.html_cleaner.html_to_text(html_strings[index])["page_content"]
+            if html_strings[index] and html_strings[index].strip()
+            else ""
+            for index in missing
+        ]
+        non_empty = [position for position, text in enumerate(texts) if text.strip()]
+        missing_counts = [0] * len(texts)
+
+        batch_counts = self.token_counter.count_tokens_batch(
+            [texts[position] for position in non_empty]
+        )
+        for position, count in zip(non_empty, batch_counts):
+            missing_counts[position] = count
+
+        for index, count in zip(missing, missing_counts):
+            counts[index] = self._html_token_cache[keys[index]] = count
+
+        return counts
 
     def chunk_document(self, html: str) -> List[Dict[str, Any]]:
         """
@@ -298,17 +972,23 @@ class DocumentChunker:
             List of text chunks
         """
         self.chunks = []
-        self.current_chunk = {"page_content": "", "metadata": {}}
+        self.current_chunk_parts = []
+        self.current_chunk_tokens = 0
         self.last_chunk_content = None
+        soup = None
 
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            soup = _make_soup(html)
             root = soup.body if soup.body else soup
 
+            self.html_cleaner.prefetch_links(root)
+
+            # Tags have a name; text nodes are kept unless blank. isspace() checks
+            # in place, where strip() would copy every text node
             elements = [
                 el
                 for el in root.children
-                if not (isinstance(el, NavigableString) and not el.strip())
+                if el.name is not None or (el and not el.isspace())
             ]
 
             self._process_elements(elements)
@@ -318,17 +998,26 @@ class DocumentChunker:
         except Exception as e:
             print(f"Error chunking document: {e}")
             return self._fallback_chunking(html)
+        finally:
+            # The tree is full of reference cycles; break them now rather than
+            # leaving the whole page to the cyclic garbage collector
+            if soup is not None:
+                soup.decompose()
 
     def _process_elements(self, elements: List[Union[Tag, NavigableString]]) -> None:
         """
         Process a list of HTML elements for chunking.
 
-        This method iterates through the elements, handling headers with their
-        content specially, and processes the regular elements individually.
+        This method groups each header with the element that follows it and
+        keeps the other elements on their own. All groups are token-counted up
+        front with one batched call, so packing them into chunks only sums
+        counts. Groups that exceed the limit on their own are split from
+        the already parsed elements, so the document is parsed only once.
 
         Args:
             elements: List of HTML elements to process
         """
+        units = []
         i = 0
         while i < len(elements):
             element = elements[i]
@@ -337,13 +1026,24 @@ class DocumentChunker:
                 next_element = elements[i + 1]
 
                 if not self._is_header(next_element):
-                    self._process_header_with_content(element, next_element)
+                    units.append((True, [element, next_element]))
                     i += 2
                     continue
 
-            self._process_regular_element(element)
+            units.append((False, [element]))
             i += 1
 
+        units_html = ["".join(map(str, unit_elements)) for _, unit_elements in units]
+        unit_tokens = self.count_tokens_batch(units_html)
+
+        for (is_header_group, unit_elements), unit_html, tokens in zip(
+            units, units_html, unit_tokens
+        ):
+            if is_header_group:
+                self._process_header_with_content(unit_elements, unit_html, tokens)
+            else:
+                self._process_regular_element(unit_elements, unit_html, tokens)
+
     def _is_header(self, element: Union[Tag, NavigableString]) -> bool:
         """
         Check if an element is a header tag.
@@ -354,97 +1054,115 @@ class DocumentChunker:
         Returns:
             True if element is a header tag (h1-h6), False otherwise
         """
-        return isinstance(element, Tag) and element.name in [
-            "h1",
-            "h2",
-            "h3",
-            "h4",
-            "h5",
-            "h6",
-        ]
+        return element.name in _HEADER_TAGS
 
     def _process_header_with_content(
-        self, header: Tag, content: Union[Tag, NavigableString]
+        self,
+        elements: List[Union[Tag, NavigableString]],
+        combined_html: str,
+        combined_tokens: int,
     ) -> None:
         """
         Process a header element together with its content.
 
         Args:
-            header: The header tag element
-            content: The content element following the header
+            elements: The header element and its content element
+            combined_html: HTML of the header followed by its content element
+            combined_tokens: Token count of combined_html
         """
-        combined_html = str(header) + str(content)
-
-        if (
-            self.count_tokens(self.current_chunk["page_content"] + combined_html)
-            <= self.chunk_token_limit
-        ):
-            self.current_chunk["page_content"] += combined_html
+        if self.current_chunk_tokens + combined_tokens <= self.chunk_token_limit:
+            self._append_to_chunk(combined_html, combined_tokens)
             return
 
         self._finalize_chunk()
 
-        if (
-            self.count_tokens(self.current_chunk["page_content"] + combined_html)
-            <= self.chunk_token_limit
-        ):
-            self.current_chunk["page_content"] += combined_html
+        if self.current_chunk_tokens + combined_tokens <= self.chunk_token_limit:
+            self._append_to_chunk(combined_html, combined_tokens)
         else:
-            self._split_and_add_content(combined_html)
+            self._split_and_add_content(elements)
 
-    def _process_regular_element(self, element: Union[Tag, NavigableString]) -> None:
+    def _process_regular_element(
+        self,
+        elements: List[Union[Tag, NavigableString]],
+        element_html: str,
+        element_tokens: int,
+    ) -> None:
         """
         Process a non-header element.
 
         Args:
-            element: The HTML element to process
+            elements: The element to process, as a single-item list
+            element_html: HTML of the element to process
+            element_tokens: Token count of element_html
         """
-        element_html = str(element)
-
-        if (
-            self.count_tokens(self.current_chunk["page_content"] + element_html)
-            <= self.chunk_token_limit
-        ):
-            self.current_chunk["page_content"] += element_html
+        if self.current_chunk_tokens + element_tokens <= self.chunk_token_limit:
+            self._append_to_chunk(element_html, element_tokens)
         else:
-            if self.count_tokens(element_html) > self.chunk_token_limit:
-                self._split_and_add_content(element_html)
+            if element_tokens > self.chunk_token_limit:
+                self._split_and_add_content(elements, [element_tokens])
             else:
                 self._finalize_chunk()
-                self.current_chunk["page_content"] += element_html
+                self._append_to_chunk(element_html, element_tokens)
 
-    def _split_and_add_content(self, content: str) -> None:
+    def _append_to_chunk(self, html: str, tokens: int) -> None:
         """
-        Split content and add to chunks.
+        Append HTML to the current chunk and update its running token count.
+
+        Token counts are summed per appended piece, so the growing chunk is never
+        re-tokenized as a whole. Pieces are joined only when the chunk is
+        finalized.
 
         Args:
-            content: HTML content string to split and add
+            html: HTML string to append
+            tokens: Token count of the HTML string
         """
-        soup = BeautifulSoup(content, "html.parser")
+        self.current_chunk_parts.append(html)
+        self.current_chunk_tokens += tokens
 
-        for element in list(soup.children):
-            if isinstance(element, Tag):
-                for part in self._split_element(element):
-                    if (
-                        self.count_tokens(self.current_chunk["page_content"] + part)
-                        > self.chunk_token_limit
-                    ):
-                        self._finalize_chunk()
-                    self.current_chunk["page_content"] += part
+    def _split_and_add_content(
+        self,
+        elements: List[Union[Tag, NavigableString]],
+        element_tokens: Optional[List[int]] = None,
+    ) -> None:
+        """
+        Split parsed elements and add them to chunks.
 
-    def _split_element(self, element) -> List[str]:
+        Args:
+            elements: Elements of the document tree to split and add
+            element_tokens: Token count of each element, if already known
+        """
+        if element_tokens is None:
+            element_tokens = self.count_tokens_batch([str(el) for el in elements])
+
+        for element, tokens in zip(elements, element_tokens):
+            for part in self._split_element(element, tokens):
+                part_tokens = self.count_tokens(part)
+                if self.current_chunk_tokens + part_tokens > self.chunk_token_limit:
+                    self._finalize_chunk()
+                self._append_to_chunk(part, part_tokens)
+
+    def _split_element(
+        self, element, element_tokens: Optional[int] = None
+    ) -> List[str]:
         """
         Recursively split an HTML element if it exceeds token limit.
 
+        The element is worked on as a node of the parsed tree. It is serialized
+        only when it is returned whole, so descending through oversized
+        elements with known counts never serializes their subtrees.
+
         Args:
             element: BeautifulSoup element (Tag or NavigableString)
+            element_tokens: Token count of the element, if already known
 
         Returns:
             List of HTML strings representing the split element.
         """
-        element_html = str(element)
-        if self.count_tokens(element_html) <= self.chunk_token_limit:
-            return [element_html]
+        if element_tokens is None:
+            element_tokens = self.count_tokens(str(element))
+
+        if element_tokens <= self.chunk_token_limit:
+            return [str(element)]
 
         if isinstance(element, NavigableString):
             return self._split_text_node(element)
@@ -452,7 +1170,7 @@ class DocumentChunker:
         if isinstance(element, Tag):
             return self._split_tag(element)
 
-        return [element_html]
+        return [str(element)]
 
     def _split_text_node(self, text_node: NavigableString) -> List[str]:
         """
@@ -464,59 +1182,72 @@ class DocumentChunker:
         Returns:
             List of text chunks that fit within token limit
         """
-        sentences = re.split(r"(?<=[.!?])\s+", str(text_node))
+        text = str(text_node)
+        sentences = _SENTENCE_SPLIT_PATTERN.split(text)
 
         if len(sentences) > 1:
-            chunks = []
-            current = ""
-
-            for sentence in sentences:
-                if not sentence.strip():
-                    continue
-
-                test_chunk = current + " " + sentence if current else sentence
-                if self.count_tokens(test_chunk) <= self.chunk_token_limit:
-                    current = test_chunk
-                else:
-                    if current:
-                        chunks.append(current.strip())
-                    current = sentence
-
-            if current:
-                chunks.append(current.strip())
+            chunks = self._pack_pieces(
+                [sentence for sentence in sentences if sentence.strip()], " "
+            )
 
             if chunks:
-                return chunks
+                return [chunk.strip() for chunk in chunks]
 
-        words = str(text_node).split()
+        words = text.split()
         chunks = []
-        current = ""
 
-        average_tokens_per_word = max(1, self.count_tokens(str(text_node)) / len(words))
-        window_size = int(self.chunk_token_limit / average_tokens_per_word)
+        average_tokens_per_word = max(1, self.count_tokens(text) / len(words))
+        window_size = max(1, int(self.chunk_token_limit / average_tokens_per_word))
 
-        for i in range(0, len(words), window_size):
-            word_group = words[i : i + window_size]
-            word_chunk = " ".join(word_group)
+        word_groups = [
+            words[i : i + window_size] for i in range(0, len(words), window_size)
+        ]
+        word_chunks = [" ".join(word_group) for word_group in word_groups]
+        word_chunk_tokens = self.count_tokens_batch(word_chunks)
 
-            if self.count_tokens(word_chunk) <= self.chunk_token_limit:
+        for word_group, word_chunk, tokens in zip(
+            word_groups, word_chunks, word_chunk_tokens
+        ):
+            if tokens <= self.chunk_token_limit:
                 chunks.append(word_chunk)
             else:
-                current = ""
-                for word in word_group:
-                    test_chunk = current + " " + word if current else word
-                    if self._cached_count_tokens(test_chunk) <= self.chunk_token_limit:
-                        current = test_chunk
-                    else:
-                        if current:
-                            chunks.append(current.strip())
-                        current = word
-
-                if current:
-                    chunks.append(current.strip())
+                chunks.extend(self._pack_pieces(word_group, " "))
 
         return chunks
 
+    def _pack_pieces(self, pieces: List[str], separator: str) -> List[str]:
+        """
+        Greedily join consecutive pieces into groups that fit within the token limit.
+
+        All pieces are counted with one batched tokenizer call, and groups are
+        then packed by summing their counts. A single piece that exceeds the
+        limit forms a group of its own.
+
+        Args:
+            pieces: Strings to pack, in order
+            separator: String placed between pieces of a group
+
+        Returns:
+            List of joined groups
+        """
+        groups = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for piece, tokens in zip(pieces, self.count_tokens_batch(pieces)):
+            if current and current_tokens + tokens > self.chunk_token_limit:
+                groups.append(separator.join(current))
+                current = []
+                current_tokens = 0
+
+            current.append(piece)
+            current_tokens += tokens
+
+        if current:
+            groups.append(separator.join(current))
+
+        return groups
+
     def _split_tag(self, tag: Tag) -> List[str]:
         """
         Split a tag by processing its children.
@@ -528,36 +1259,37 @@ class DocumentChunker:
             List of HTML strings with the tag's content split into chunks
         """
         children = list(tag.children)
+        child_strs = [str(child) for child in children]
         parts = []
         current_group = ""
+        current_tokens = 0
 
-        for child in children:
-            child_str = str(child)
-            test_group = current_group + child_str
-
-            if self.count_tokens(test_group) <= self.chunk_token_limit:
-                current_group = test_group
+        for child, child_str, child_tokens in zip(
+            children, child_strs, self.count_tokens_batch(child_strs)
+        ):
+            if current_tokens + child_tokens <= self.chunk_token_limit:
+                current_group += child_str
+                current_tokens += child_tokens
             else:
                 if current_group:
                     parts.append(current_group)
 
-                if self.count_tokens(child_str) > self.chunk_token_limit:
-                    parts.extend(self._split_element(child))
+                if child_tokens > self.chunk_token_limit:
+                    parts.extend(self._split_element(child, child_tokens))
+                    current_group = ""
+                    current_tokens = 0
                 else:
                     current_group = child_str
+                    current_tokens = child_tokens
 
         if current_group:
             parts.append(current_group)
 
-        wrapped_parts = []
-        for part in parts:
-            tag_copy = f"<{tag.name}"
-            for attr, value in tag.attrs.items():
-                tag_copy += f' {attr}="{value}"'
-            tag_copy += f">{part}</{tag.name}>"
-            wrapped_parts.append(tag_copy)
+        attrs = "".join(f' {attr}="{value}"' for attr, value in tag.attrs.items())
+        open_tag = f"<{tag.name}{attrs}>"
+        close_tag = f"</{tag.name}>"
 
-        return wrapped_parts
+        return [f"{open_tag}{part}{close_tag}" for part in parts]
 
     def _finalize_chunk(self) -> None:
         """
@@ -566,39 +1298,50 @@ class DocumentChunker:
         This method processes the current chunk, cleans it, and adds it to
         the chunks list if it contains non-empty content.
         """
-        if self.current_chunk["page_content"].strip():
-            self.current_chunk = self.html_cleaner.process_links(
-                self.current_chunk["page_content"]
-            )
-            self.current_chunk["page_content"] = self.html_cleaner.clean_html(
-                self.current_chunk["page_content"]
-            )
+        current_chunk_html = "".join(self.current_chunk_parts)
+
+        if current_chunk_html.strip():
+            current_chunk = self.html_cleaner.html_to_text(current_chunk_html)
 
-            if self.current_chunk["page_content"].strip():
-                self.chunks.append(self.current_chunk)
-                self.last_chunk_content = self.current_chunk["page_content"]
+            if current_chunk["page_content"].strip():
+                self.chunks.append(current_chunk)
+                self.last_chunk_content = current_chunk["page_content"]
 
-        self.current_chunk = {"page_content": "", "metadata": {}}
+        self.current_chunk_parts = []
+        self.current_chunk_tokens = 0
 
-        if self.overlap > 0 and self.last_chunk_content:
-            overlap_size = int(self.chunk_token_limit * self.overlap)
-            if overlap_size > 0:
-                words = self.last_chunk_content.split()
-                overlap_words = words[-min(len(words), overlap_size) :]
-                overlap_text = " ".join(overlap_words)
+        if self.overlap_size > 0 and self.last_chunk_content:
+            # Split off only the trailing words instead of the whole chunk
+            tail_words = self.last_chunk_content.rsplit(maxsplit=self.overlap_size)
+            overlap_text = " ".join(tail_words[-self.overlap_size :])
 
-                overlap_tokens = self.token_counter.count_tokens(overlap_text)
-                if overlap_tokens <= self.chunk_token_limit:
-                    self.current_chunk["page_content"] = overlap_text
+            overlap_tokens = self.token_counter.count_tokens(overlap_text)
+            if overlap_tokens <= self.chunk_token_limit:
+                # Split text parts carry no markup, so keep the overlap apart
+                self._append_to_chunk(overlap_text + " ", overlap_tokens)
 
     def _get_sliding_window_chunks(self, text: str) -> List[Dict[str, Any]]:
-        if not text or self.count_tokens(text) <= self.chunk_token_limit:
+        """
+        Split text into overlapping windows of words that fit within the token limit.
+
+        The text is already cleaned, so it is counted by the tokenizer directly.
+        All windows are counted with one batched call, and only the windows
+        over the limit are shrunk.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of chunks, one per window
+        """
+        text_tokens = self.token_counter.count_tokens(text) if text else 0
+        if text_tokens <= self.chunk_token_limit:
             return [{"page_content": text, "metadata": {}}]
 
         words = text.split()
         result_chunks = []
 
-        average_tokens_per_word = max(1, self.count_tokens(text) / len(words))
+        average_tokens_per_word = max(1, text_tokens / len(words))
         window_size = int(self.chunk_token_limit / average_tokens_per_word)
 
         if window_size <= 0:
@@ -607,92 +1350,125 @@ class DocumentChunker:
         step_size = int(window_size * (1.0 - self.overlap))
         step_size = max(1, step_size)
 
-        for i in range(0, len(words), step_size):
-            window_words = words[i : i + window_size]
-            window_text = " ".join(window_words)
+        windows = [words[i : i + window_size] for i in range(0, len(words), step_size)]
+        window_texts = [" ".join(window_words) for window_words in windows]
+        window_tokens = self.token_counter.count_tokens_batch(window_texts)
 
-            while (
-                self.count_tokens(window_text) > self.chunk_token_limit
-                and len(window_words) > 1
-            ):
-                window_words.pop()
-                window_text = " ".join(window_words)
+        for window_words, window_text, tokens in zip(
+            windows, window_texts, window_tokens
+        ):
+            if tokens > self.chunk_token_limit:
+                window_text = self._fit_words(window_words)
 
             if window_text.strip():
-                processed_chunk = self.html_cleaner.process_links(window_text)
-                processed_chunk["page_content"] = self.html_cleaner.clean_html(
-                    processed_chunk["page_content"]
-                )
+                processed_chunk = self.html_cleaner.html_to_text(window_text)
 
                 if processed_chunk["page_content"].strip():
                     result_chunks.append(processed_chunk)
 
         return result_chunks
 
+    def _fit_words(self, words: List[str]) -> str:
+        """
+        Join the longest prefix of words that fits within the token limit.
+
+        The prefix length is found by binary search, so an oversized window
+        costs O(log n) token counts instead of one per dropped word.
+
+        Args:
+            words: Words of the window, at least one
+
+        Returns:
+            The joined prefix, at least the first word
+        """
+        window_text = " ".join(words)
+        if self.token_counter.count_tokens(window_text) <= self.chunk_token_limit:
+            return window_text
+
+        low, high = 1, len(words) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            middle_text = " ".join(words[:middle])
+            if self.token_counter.count_tokens(middle_text) <= self.chunk_token_limit:
+                low = middle
+            else:
+                high = middle - 1
+
+        return " ".join(words[:low])
+
     def _fallback_chunking(self, html: str) -> List[Dict[str, Any]]:
         """
         Fallback method for chunking if the main method fails.
 
+        Paragraphs and sentences are counted in batches and collected as parts
+        with a running token count, so the growing chunk is never re-built or
+        re-tokenized.
+
         Args:
             html: HTML content to chunk
 
         Returns:
             List of text chunks created using a simpler chunking strategy
         """
-        processed_chunk = self.html_cleaner.process_links(html)
-        processed_chunk["page_content"] = self.html_cleaner.clean_html(
-            processed_chunk["page_content"]
-        )
+        processed_chunk = self.html_cleaner.html_to_text(html)
 
         if self.overlap > 0:
             return self._get_sliding_window_chunks(processed_chunk["page_content"])
 
-        paragraphs = re.split(r"\n\s*\n", processed_chunk["page_content"])
+        paragraphs = [
+            paragraph
+            for paragraph in _PARAGRAPH_SPLIT_PATTERN.split(
+                processed_chunk["page_content"]
+            )
+            if paragraph.strip()
+        ]
 
         chunks = []
-        current_chunk = {"page_content": "", "metadata": {}}
+        current_parts: List[str] = []
+        current_tokens = 0
 
-        for paragraph in paragraphs:
-            if not paragraph.strip():
+        for paragraph, paragraph_tokens in zip(
+            paragraphs, self.token_counter.count_tokens_batch(paragraphs)
+        ):
+            if current_tokens + paragraph_tokens <= self.chunk_token_limit:
+                current_parts.append(paragraph)
+                current_tokens += paragraph_tokens
                 continue
 
-            if (
-                self.count_tokens(current_chunk["page_content"] + paragraph)
-                <= self.chunk_token_limit
-            ):
-                current_chunk["page_content"] += (
-                    " " + paragraph if current_chunk["page_content"] else paragraph
-                )
-            else:
-                if current_chunk["page_content"]:
-                    chunks.append(current_chunk)
-
-                if self.count_tokens(paragraph) > self.chunk_token_limit:
-                    sentences = re.split(r"(?<=[.!?])\s+", paragraph)
-                    current_chunk = {"page_content": "", "metadata": {}}
-
-                    for sentence in sentences:
-                        if not sentence.strip():
-                            continue
-
-                        if (
-                            self.count_tokens(current_chunk["page_content"] + sentence)
-                            <= self.chunk_token_limit
-                        ):
-                            current_chunk["page_content"] += (
-                                " " + sentence
-                                if current_chunk["page_content"]
-                                else sentence
+            if current_parts:
+                chunks.append({"page_content": " ".join(current_parts), "metadata": {}})
+
+            if paragraph_tokens > self.chunk_token_limit:
+                sentences = [
+                    sentence
+                    for sentence in _SENTENCE_SPLIT_PATTERN.split(paragraph)
+                    if sentence.strip()
+                ]
+                current_parts = []
+                current_tokens = 0
+
+                for sentence, sentence_tokens in zip(
+                    sentences, self.token_counter.count_tokens_batch(sentences)
+                ):
+                    if current_tokens + sentence_tokens <= self.chunk_token_limit:
+                        current_parts.append(sentence)
+                        current_tokens += sentence_tokens
+                    else:
+                        if current_parts:
+                            chunks.append(
+                                {
+                                    "page_content": " ".join(current_parts),
+                                    "metadata": {},
+                                }
                             )
-                        else:
-                            if current_chunk["page_content"]:
-                                chunks.append(current_chunk)
-                            current_chunk = {"page_content": sentence, "metadata": {}}
-                else:
-                    current_chunk = {"page_content": paragraph, "metadata": {}}
+                        current_parts = [sentence]
+                        current_tokens = sentence_tokens
+            else:
+                current_parts = [paragraph]
+                current_tokens = paragraph_tokens
 
-        if current_chunk["page_content"]:
-            chunks.append(current_chunk)
+        if current_parts:
+            chunks.append({"page_content": " ".join(current_parts), "metadata": {}})
 
         return chunks
 
@@ -719,14 +1495,52 @@ class HtmlProcessor:
             chunk_token_limit: Maximum number of tokens per chunk
             overlap: Percentage of overlap between chunks (0.0-0.5)
         """
+        self.confluence_client = confluence_client
         self.confluence_resolver = ConfluenceResolver(confluence_client)
         self.token_counter = TokenCounter(tokenizer)
         self.html_cleaner = HtmlCleaner(self.confluence_resolver)
         self.document_chunker = DocumentChunker(
             self.html_cleaner, self.token_counter, chunk_token_limit, overlap
         )
+        # Page worker processes, started by the first parallel run
+        self._page_pool: Optional[ProcessPoolExecutor] = None
+        self._page_pool_workers = 0
 
-    def clean_html(self, html: str, keep_tags: Optional[set] = None) -> str:
+    def close(self) -> None:
+        """
+        Shut down the link resolver's thread pool and the page worker processes.
+
+        Warm function instances create a processor for every invocation, so
+        its pools must be shut down once the processor is no longer needed.
+        Pages still queued for the workers are dropped. The processor can be
+        used as a context manager, which closes it on exit.
+        """
+        self.confluence_resolver.close()
+        if self._page_pool is not None:
+            self._page_pool.shutdown(cancel_futures=True)
+            self._page_pool = None
+
+    def __enter__(self) -> "HtmlProcessor":
+        """
+        Enter the context of the processor.
+
+        Returns:
+            The processor itself
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Close the processor when its context is left.
+
+        Args:
+            exc_info: Exception type, value and traceback, if any
+        """
+        self.close()
+
+    def clean_html(
+        self, html: str, keep_tags: Optional[AbstractSet[str]] = None
+    ) -> str:
         """
         Clean HTML by removing or keeping specified tags.
 
@@ -776,15 +1590,68 @@ class HtmlProcessor:
         """
         return self.document_chunker.chunk_document(html)
 
+    def process_page(
+        self, page: Dict[str, Any], keep_tags: Optional[AbstractSet[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Process a single Confluence page into chunks.
+
+        Args:
+            page: Page object from Confluence API
+            keep_tags: Set of tag names to preserve
+
+        Returns:
+            Tuple of (documents, metadatas) for the chunks of the page, both
+            empty if the page has no content
+        """
+        page_id = page.get("id", "unknown")
+
+        html_text = page["body"]["storage"]["value"]
+
+        html_text = self.clean_html(html_text, keep_tags)
+        chunks = self.chunk_document(html_text)
+
+        if not chunks:
+            return [], []
+
+        page_url = page["_links"]["base"] + page["_links"]["webui"]
+        metadata = [
+            {
+                "title": page["title"],
+                "page_id": page_id,
+                "page_url": page_url,
+                "links": json.dumps(chunk["metadata"], ensure_ascii=False)
+                if chunk["metadata"]
+                else "{}",
+            }
+            for chunk in chunks
+        ]
+        document = [
+            {
+                "page_content": chunk["page_content"],
+                "title": page["title"],
+            }
+            for chunk in chunks
+        ]
+
+        return document, metadata
+
     def process_pages(
-        self, pages: List[Dict[str, Any]], keep_tags: Optional[set] = None
+        self,
+        pages: Iterable[Dict[str, Any]],
+        keep_tags: Optional[AbstractSet[str]] = None,
+        max_workers: int = 1,
     ) -> tuple:
         """
-        Process a list of Confluence pages, chunking each page.
+        Process Confluence pages, chunking each page.
+
+        Collects the results of iter_processed_pages into lists.
 
         Args:
-            pages: List of page objects from Confluence API
+            pages: Page objects from Confluence API, either a list or a stream
             keep_tags: Set of tag names to preserve
+            max_workers: Maximum number of worker processes. With 1, or with no
+                more pages than workers, pages are processed in this process.
 
         Returns:
             Tuple of (documents, metadatas, empty_pages) where:
@@ -795,59 +1662,265 @@ class HtmlProcessor:
         documents = []
         metadatas = []
         empty_pages = []
+
+        for document, metadata, empty_page_id in self.iter_processed_pages(
+            pages, keep_tags, max_workers
+        ):
+            if empty_page_id is not None:
+                empty_pages.append(empty_page_id)
+                continue
+
+            documents.extend(document)
+            metadatas.extend(metadata)
+
+        return documents, metadatas, empty_pages
+
+    def iter_processed_pages(
+        self,
+        pages: Iterable[Dict[str, Any]],
+        keep_tags: Optional[AbstractSet[str]] = None,
+        max_workers: int = 1,
+        failed_pages: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]]]:
+        """
+        Process Confluence pages lazily, yielding the chunks of one page at a time.
+
+        Only the pages in flight are held in memory, so callers can embed and
+        store chunks in batches instead of keeping all chunks of a space.
+
+        With more than one worker, pages are sharded across worker processes,
+        since parsing is CPU-bound and holds the GIL. Results keep the order of
+        the input pages.
+
+        Args:
+            pages: Page objects from Confluence API, either a list or a stream
+            keep_tags: Set of tag names to preserve
+            max_workers: Maximum number of worker processes. With 1, or with no
+                more pages than workers, pages are processed in this process.
+            failed_pages: Optional list that collects the IDs of pages whose
+                processing raised an error
+
+        Yields:
+            Tuple of (documents, metadatas, empty_page_id) for each page, where
+            empty_page_id is the page ID if the page couldn't be processed or
+            has no content, and None otherwise
+        """
         duration_times = []
 
-        number_pages = len(pages)
+        number_pages = len(pages) if isinstance(pages, Sized) else "?"
 
-        for idx, page in enumerate(pages):
-            try:
-                average_duration_time = (
-                    sum(duration_times) / len(duration_times) if duration_times else 0
-                )
-                print(
-                    f"Processing page: {idx}/{number_pages}\nAverage duration time: {average_duration_time}"
-                )
+        if max_workers > 1 and not (
+            isinstance(pages, Sized) and len(pages) <= max_workers
+        ):
+            results = self._iter_page_results_parallel(pages, keep_tags, max_workers)
+        else:
+            results = (_run_page(self, page, keep_tags) for page in pages)
+
+        for idx, (
+            page_id,
+            page_title,
+            document,
+            metadata,
+            error,
+            duration,
+        ) in enumerate(results):
+            average_duration_time = (
+                sum(duration_times) / len(duration_times) if duration_times else 0
+            )
+            print(
+                f"Processing page: {idx}/{number_pages}\nAverage duration time: {average_duration_time}"
+            )
 
-                start_time = time.time()
-                page_id = page.get("id", "unknown")
+            if error is not None:
+                print(f"Error processing page {page_id} ({page_title}): {error}")
+                if failed_pages is not None:
+                    failed_pages.append(page_id)
+                yield [], [], page_id
+                continue
 
-                html_text = page["body"]["storage"]["value"]
+            if not document:
+                yield [], [], page_id
+                continue
 
-                html_text = self.clean_html(html_text, keep_tags)
-                chunks = self.chunk_document(html_text)
+            duration_times.append(duration)
+            yield document, metadata, None
 
-                if not chunks:
-                    empty_pages.append(page_id)
-                    continue
+    def _iter_page_results_parallel(
+        self,
+        pages: Iterable[Dict[str, Any]],
+        keep_tags: Optional[AbstractSet[str]],
+        max_workers: int,
+    ) -> Iterator[tuple]:
+        """
+        Process pages on a pool of worker processes, yielding results in order.
 
-                page_url = page["_links"]["base"] + page["_links"]["webui"]
-                metadata = [
-                    {
-                        "title": page["title"],
-                        "page_id": page_id,
-                        "page_url": page_url,
-                        "links": json.dumps(chunk["metadata"], ensure_ascii=False)
-                        if chunk["metadata"]
-                        else "{}",
-                    }
-                    for chunk in chunks
-                ]
-                document = [
-                    {
-                        "page_content": chunk["page_content"],
-                        "title": page["title"],
-                    }
-                    for chunk in chunks
-                ]
+        The workers are kept until the processor is closed, so later runs skip
+        starting them. At most max_workers * 4 pages are in flight, so a page
+        stream is not read into memory all at once.
 
-                documents.extend(document)
-                metadatas.extend(metadata)
-                duration_times.append(time.time() - start_time)
+        Args:
+            pages: Page objects from Confluence API, either a list or a stream
+            keep_tags: Set of tag names to preserve
+            max_workers: Number of worker processes
 
-            except Exception as e:
-                page_id = page.get("id", "unknown")
-                page_title = page.get("title", "unknown")
-                empty_pages.append(page_id)
-                print(f"Error processing page {page_id} ({page_title}): {str(e)}")
+        Yields:
+            Page results as returned by _run_page
+        """
+        executor = self._get_page_pool(max_workers)
+        in_flight = deque()
 
-        return documents, metadatas, empty_pages
+        for page in pages:
+            in_flight.append(executor.submit(_run_page_in_worker, page, keep_tags))
+            if len(in_flight) >= max_workers * 4:
+                yield _collect_page_result(in_flight.popleft())
+
+        while in_flight:
+            yield _collect_page_result(in_flight.popleft())
+
+    def _get_page_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        """
+        Get the pool of page worker processes, starting it on first use.
+
+        Workers are started with spawn rather than fork, so they do not inherit
+        this process's threads, sockets or gRPC channels. Each worker builds
+        its own HtmlProcessor from the Confluence connection settings and the
+        unpickled tokenizer, and starts from the links resolved here when the
+        pool is started. The links a worker resolves are sent back with each
+        page result.
+
+        Args:
+            max_workers: Number of worker processes. A pool of another size is
+                shut down and replaced.
+
+        Returns:
+            Pool of page worker processes
+        """
+        if self._page_pool is not None and self._page_pool_workers == max_workers:
+            return self._page_pool
+
+        if self._page_pool is not None:
+            self._page_pool.shutdown()
+
+        confluence_settings = {
+            "url": self.confluence_client.url,
+            "username": self.confluence_client.username,
+            "password": self.confluence_client.password,
+            "timeout": self.confluence_client.timeout,
+            "verify_ssl": self.confluence_client.verify_ssl,
+        }
+        initargs = (
+            confluence_settings,
+            self.token_counter.tokenizer,
+            self.document_chunker.chunk_token_limit,
+            self.document_chunker.overlap,
+            ConfluenceResolver.export_links(include_missing=True),
+            ConfluenceResolver.link_max_age_seconds,
+        )
+
+        self._page_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_page_worker,
+            initargs=initargs,
+        )
+        self._page_pool_workers = max_workers
+        return self._page_pool
+
+
+_worker_processor: Optional[HtmlProcessor] = None
+
+
+def _init_page_worker(
+    confluence_settings: Dict[str, Any],
+    tokenizer: Callable[[str], int],
+    chunk_token_limit: int,
+    overlap: float,
+    links: Dict[str, List[list]],
+    link_max_age_seconds: float,
+) -> None:
+    """
+    Create the HtmlProcessor of a page worker process.
+
+    Args:
+        confluence_settings: Keyword arguments for the Confluence client
+        tokenizer: Function that counts tokens in a string
+        chunk_token_limit: Maximum number of tokens per chunk
+        overlap: Percentage of overlap between chunks (0.0-0.5)
+        links: Resolved links to start from, as exported by
+            ConfluenceResolver.export_links
+        link_max_age_seconds: Age after which a resolved link is looked up again
+    """
+    global _worker_processor
+    ConfluenceResolver.link_max_age_seconds = link_max_age_seconds
+    ConfluenceResolver.import_links(links)
+    ConfluenceResolver.drain_new_links()
+    _worker_processor = HtmlProcessor(
+        Confluence(**confluence_settings), tokenizer, chunk_token_limit, overlap
+    )
+
+
+def _run_page_in_worker(
+    page: Dict[str, Any], keep_tags: Optional[AbstractSet[str]]
+) -> tuple:
+    """
+    Process a page with the HtmlProcessor of the current worker process.
+
+    Args:
+        page: Page object from Confluence API
+        keep_tags: Set of tag names to preserve
+
+    Returns:
+        Tuple of the page result as returned by _run_page and the links
+        resolved while processing it
+    """
+    result = _run_page(_worker_processor, page, keep_tags)
+    return result, ConfluenceResolver.drain_new_links()
+
+
+def _collect_page_result(future: Future) -> tuple:
+    """
+    Wait for a page worker, keeping the links it resolved in this process.
+
+    Args:
+        future: Future of a _run_page_in_worker call
+
+    Returns:
+        Page result as returned by _run_page
+    """
+    result, new_links = future.result()
+    ConfluenceResolver.import_links(new_links)
+    return result
+
+
+def _run_page(
+    processor: HtmlProcessor,
+    page: Dict[str, Any],
+    keep_tags: Optional[AbstractSet[str]],
+) -> tuple:
+    """
+    Process a page, capturing any error instead of raising it.
+
+    Args:
+        processor: HtmlProcessor to process the page with
+        page: Page object from Confluence API
+        keep_tags: Set of tag names to preserve
+
+    Returns:
+        Tuple of (page_id, page_title, documents, metadatas, error, duration),
+        where error is None on success
+    """
+    start_time = time.time()
+    try:
+        document, metadata = processor.process_page(page, keep_tags)
+        error = None
+    except Exception as e:
+        document, metadata, error = [], [], str(e)
+
+    return (
+        page.get("id", "unknown"),
+        page.get("title", "unknown"),
+        document,
+        metadata,
+        error,
+        time.time() - start_time,
+    )
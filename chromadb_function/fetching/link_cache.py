@@ -0,0 +1,102 @@
+import json
+from typing import Any, Dict, Optional
+
+from google.api_core import exceptions
+from google.cloud import storage
+
+
+class LinkCacheStore:
+    """
+    Keeps resolved Confluence links in a GCS blob between function invocations.
+
+    Resolving a link costs one or two Confluence requests, and the in-memory
+    caches are lost with the function instance. The store saves them as JSON
+    and loads them on the next cold start. Every link keeps the time it was
+    resolved, and ConfluenceResolver drops it once it is too old.
+    """
+
+    # Version of the saved format, caches saved in another format are ignored
+    FORMAT_VERSION = 2
+
+    def __init__(
+        self,
+        storage_name: str,
+        blob_name: str,
+        storage_client: Optional[storage.Client] = None,
+    ):
+        """
+        Initialize the store with the location of the cache blob.
+
+        Args:
+            storage_name: Name of the GCS bucket holding the cache
+            blob_name: Name of the cache blob
+            storage_client: Optional storage client. If None, a new client is
+                created.
+        """
+        self.storage_client = storage_client or storage.Client()
+        self.storage_name = storage_name
+        self.blob_name = blob_name
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the saved links.
+
+        Returns:
+            Dictionary containing success status, message and links. Links are
+            empty if there is no cache or it has another format.
+        """
+        result = {"success": False, "message": "", "links": {}}
+
+        try:
+            blob = self.storage_client.bucket(self.storage_name).blob(self.blob_name)
+            data = json.loads(blob.download_as_bytes())
+
+            if data.get("version") != self.FORMAT_VERSION:
+                result["success"] = True
+                result["message"] = "Link cache has another format, starting empty."
+                return result
+
+            result["links"] = data.get("links", {})
+            result["success"] = True
+            result["message"] = (
+                f"Loaded {len(result['links'].get('pages', []))} page links and "
+                f"{len(result['links'].get('users', []))} user links."
+            )
+
+        except exceptions.NotFound:
+            result["success"] = True
+            result["message"] = "No link cache found, starting empty."
+        except Exception as e:
+            result["message"] = f"Error loading link cache: {str(e)}"
+
+        return result
+
+    def save(self, links: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Save links, replacing the previous cache.
+
+        Args:
+            links: Links as exported by ConfluenceResolver.export_links
+
+        Returns:
+            Dictionary containing success status and message
+        """
+        result = {"success": False, "message": ""}
+
+        try:
+            blob = self.storage_client.bucket(self.storage_name).blob(self.blob_name)
+            blob.upload_from_string(
+                json.dumps({"version": self.FORMAT_VERSION, "links": links}),
+                content_type="application/json",
+            )
+
+            result["success"] = True
+            result["message"] = (
+                f"Saved {len(links.get('pages', []))} page links and "
+                f"{len(links.get('users', []))} user links."
+            )
+
+        except Exception as e:
+            result["message"] = f"Error saving link cache: {str(e)}"
+
+        return result
@@ -1,30 +1,36 @@
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 import config
 import functions_framework
 from atlassian import Confluence
 from backing_up.backing_up import BackupClient
 from embedding.embedder import VertexAIChromaEmbedder, VertexAITokenizer
+from embedding.embedding_cache import EmbeddingCacheStore
 from fetching.confluence_fetcher import ConfluenceFetcher
-from fetching.html_processor import HtmlProcessor
+from fetching.html_processor import ConfluenceResolver, HtmlProcessor
+from fetching.link_cache import LinkCacheStore
+from requests.adapters import HTTPAdapter
 from updating.chroma_updating import ChromaClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 @functions_framework.cloud_event
 def event_handler(cloud_event):
     backup_client = BackupClient(
         source_storage_name=config.CHROMA_STORAGE_NAME,
         backup_storage_name=config.BACKUP_STORAGE_NAME,
+        max_workers=config.BACKUP_WORKERS,
     )
 
-    confluence_client = Confluence(
-        url=config.CONFLUENCE_URL,
-        username=config.CONFLUENCE_USERNAME,
-        password=config.CONFLUENCE_PASSWORD,
-    )
+    confluence_client = get_confluence_client()
 
     confluence_fetcher = ConfluenceFetcher(
         confluence_client=confluence_client, max_workers=config.MAX_WORKERS
@@ -33,17 +39,26 @@ def event_handler(cloud_event):
     tokenizer = VertexAITokenizer(
         model_name=config.VERTEXAI_MODEL_NAME, task_type=config.VERTEXAI_TASK_TYPE
     )
+
+    embedding_cache_store = EmbeddingCacheStore(
+        storage_name=config.EMBEDDING_CACHE_STORAGE_NAME,
+        blob_name=config.EMBEDDING_CACHE_BLOB_NAME,
+        storage_client=backup_client.storage_client,
+    )
+    embedding_cache_result = embedding_cache_store.load()
+
+    logger.info(embedding_cache_result["message"])
+
     embedder = VertexAIChromaEmbedder(
         model_name=config.VERTEXAI_MODEL_NAME,
         task_type=config.VERTEXAI_TASK_TYPE,
         dimensions=config.VERTEXAI_VECTOR_DIMENSIONS,
+        batch_size=config.VERTEXAI_EMBEDDING_BATCH_SIZE,
+        max_workers=config.VERTEXAI_EMBEDDING_WORKERS,
+        cache=embedding_cache_result["embeddings"],
     )
 
-    chroma_client = ChromaClient(
-        chroma_host=config.CHROMA_HOST,
-        chroma_port=config.CHROMA_PORT,
-        embedder=embedder,
-    )
+    chroma_client = get_chroma_client()
 
     html_processor = HtmlProcessor(
         confluence_client=confluence_client,
@@ -52,43 +67,211 @@ def event_handler(cloud_event):
         overlap=config.CHUNK_OVERLAP,
     )
 
-    logger.info("Starting backup...")
+    link_cache_store = LinkCacheStore(
+        storage_name=config.LINK_CACHE_STORAGE_NAME,
+        blob_name=config.LINK_CACHE_BLOB_NAME,
+        storage_client=backup_client.storage_client,
+    )
+    link_cache_result = link_cache_store.load()
+    ConfluenceResolver.link_max_age_seconds = config.LINK_CACHE_MAX_AGE_SECONDS
+    ConfluenceResolver.import_links(link_cache_result["links"])
 
-    backup_result = backup_client.backup(backups_number=config.BACKUPS_NUMBER)
+    logger.info(link_cache_result["message"])
 
-    logger.info(backup_result["message"])
+    with (
+        confluence_fetcher,
+        html_processor,
+        ThreadPoolExecutor(max_workers=1) as backup_executor,
+    ):
+        logger.info("Starting backup...")
 
-    logger.info("Fetching pages...")
+        backup_future = backup_executor.submit(
+            backup_client.backup, backups_number=config.BACKUPS_NUMBER
+        )
+        backup_future.add_done_callback(log_backup_result)
 
-    page_ids = confluence_fetcher.get_all_space_pages(
-        space=config.CONFLUENCE_SPACE, exclude_roots=config.EXCLUDE_PAGES_IDS
-    )
+        logger.info("Fetching, processing and embedding pages...")
 
-    pages = confluence_fetcher.get_pages_content(page_ids=page_ids)
+        failed_pages = []
+        pages = confluence_fetcher.get_space_pages_content(
+            space=config.CONFLUENCE_SPACE,
+            exclude_roots=config.EXCLUDE_PAGES_IDS,
+            failed_pages=failed_pages,
+        )
 
-    logger.info(f"Fetching completed. Number of pages: {len(pages)}")
+        processed_pages = html_processor.iter_processed_pages(
+            pages,
+            config.KEEP_TAGS,
+            max_workers=config.PROCESSING_WORKERS,
+            failed_pages=failed_pages,
+        )
 
-    logger.info("Processing pages...")
+        empty_pages = []
+        batches = iter_embedded_batches(
+            processed_pages, embedder, config.UPDATE_BATCH_SIZE, empty_pages
+        )
 
-    documents, metadatas, empty_pages = html_processor.process_pages(
-        pages, config.KEEP_TAGS
-    )
+        logger.info("Updating ChromaDB...")
+
+        update_result = chroma_client.update_batches(
+            collection_name=config.COLLECTION_NAME,
+            batches=iter_after(batches, backup_future, config.UPDATE_PREFETCH_BATCHES),
+            # Stale documents are only deleted once every page was fetched and
+            # processed, so pages that failed keep their documents
+            delete_stale=lambda: not failed_pages,
+            min_seen_fraction=config.UPDATE_MIN_SEEN_FRACTION,
+        )
 
     logger.info(
-        f"Processing completed. Number of documents: {len(documents)}. Number of empty pages: {len(empty_pages)}"
+        f"Processing completed. Number of empty pages: {len(empty_pages)}, "
+        f"failed pages: {len(failed_pages)}"
     )
+    logger.info(update_result["message"])
+
+    # A failed update may have embedded only part of the space, and saving
+    # that would drop the cached embeddings of the rest
+    if update_result["success"]:
+        embedding_cache_save_result = embedding_cache_store.save(
+            embedder.cached_embeddings
+        )
+
+        logger.info(embedding_cache_save_result["message"])
+
+    save_result = link_cache_store.save(ConfluenceResolver.export_links())
+
+    logger.info(save_result["message"])
+
 
-    logger.info("Updating ChromaDB...")
-    logger.info("Get embeddings...")
-    embeddings = embedder(documents)
+@lru_cache(maxsize=1)
+def get_confluence_client() -> Confluence:
+    """
+    Get the Confluence client, creating it on the first invocation.
 
-    logger.info("Embeddings done")
+    Warm function instances reuse the client and its pooled connections.
 
-    update_result = chroma_client.update(
-        collection_name=config.COLLECTION_NAME,
-        documents=documents,
-        embeddings=embeddings,
-        metadatas=metadatas,
+    Returns:
+        Confluence client
+    """
+    confluence_client = Confluence(
+        url=config.CONFLUENCE_URL,
+        username=config.CONFLUENCE_USERNAME,
+        password=config.CONFLUENCE_PASSWORD,
     )
 
-    logger.info(update_result["message"])
+    # The default adapter keeps 10 connections, fewer than the concurrent lookups
+    confluence_client._session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=10, pool_maxsize=config.CONFLUENCE_HTTP_POOL_SIZE),
+    )
+
+    return confluence_client
+
+
+@lru_cache(maxsize=1)
+def get_chroma_client() -> ChromaClient:
+    """
+    Get the ChromaDB client, creating it on the first invocation.
+
+    Creating the client checks the tenant and database on the server, which
+    warm function instances skip by reusing it.
+
+    Returns:
+        ChromaDB client
+    """
+    return ChromaClient(chroma_host=config.CHROMA_HOST, chroma_port=config.CHROMA_PORT)
+
+
+def log_backup_result(future: Future) -> None:
+    """
+    Log the outcome of the backup once it is done.
+
+    A failed backup is logged here, since an exception raised in a done
+    callback is only reported as an error of the callback itself.
+
+    Args:
+        future: Future of a BackupClient.backup call
+    """
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Backup failed: {str(error)}", exc_info=error)
+        return
+
+    logger.info(future.result()["message"])
+
+
+def iter_embedded_batches(
+    processed_pages: Iterable[
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]]
+    ],
+    embedder: VertexAIChromaEmbedder,
+    batch_size: int,
+    empty_pages: List[str],
+) -> Iterator[Tuple[List[Any], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Group the chunks of processed pages into batches and embed each batch.
+
+    Pages are consumed only as batches are requested, so at most one batch of
+    chunks and the pages in flight are held in memory.
+
+    Args:
+        processed_pages: Results of HtmlProcessor.iter_processed_pages
+        embedder: Embedding function for the documents
+        batch_size: Number of documents per batch
+        empty_pages: List that collects the IDs of pages without chunks
+
+    Yields:
+        Tuples of (embeddings, documents, metadatas) for each batch
+    """
+    documents = []
+    metadatas = []
+
+    for document, metadata, empty_page_id in processed_pages:
+        if empty_page_id is not None:
+            empty_pages.append(empty_page_id)
+            continue
+
+        documents.extend(document)
+        metadatas.extend(metadata)
+
+        while len(documents) >= batch_size:
+            batch_documents = documents[:batch_size]
+            batch_metadatas = metadatas[:batch_size]
+            del documents[:batch_size], metadatas[:batch_size]
+
+            yield embedder(batch_documents), batch_documents, batch_metadatas
+
+    if documents:
+        yield embedder(documents), documents, metadatas
+
+
+def iter_after(items: Iterable[T], future: Future, max_buffered: int) -> Iterator[T]:
+    """
+    Hold back items until a future is done, reading ahead in the meantime.
+
+    The handler uses it to keep Chroma untouched until the backup of its
+    storage is complete, while pages are already fetched, processed and
+    embedded.
+
+    Args:
+        items: Items to pass through
+        future: Future to wait for before the first item is yielded
+        max_buffered: Maximum number of items read ahead while waiting
+
+    Yields:
+        The items, in order
+    """
+    iterator = iter(items)
+    buffered = deque()
+
+    while not future.done() and len(buffered) < max_buffered:
+        try:
+            buffered.append(next(iterator))
+        except StopIteration:
+            break
+
+    future.result()
+
+    while buffered:
+        yield buffered.popleft()
+
+    yield from iterator
@@ -0,0 +1,178 @@
+import unittest
+from typing import Any, Dict, List, Optional
+
+from updating.chroma_updating import ChromaClient
+
+
+class FakeCollection:
+    """In-memory stand-in for a ChromaDB collection."""
+
+    def __init__(self, ids: Optional[List[str]] = None, fail_on_upsert: int = 0):
+        """
+        Initialize the collection.
+
+        Args:
+            ids: IDs of the documents already in the collection
+            fail_on_upsert: Number of the upsert call that raises, or 0 to
+                never raise
+        """
+        self.ids = set(ids or [])
+        self.fail_on_upsert = fail_on_upsert
+        self.upsert_calls = 0
+        self.deleted_ids: List[str] = []
+
+    def get(self, include: List[str]) -> Dict[str, Any]:
+        return {"ids": sorted(self.ids)}
+
+    def upsert(self, ids: List[str], **kwargs: Any) -> None:
+        self.upsert_calls += 1
+        if self.upsert_calls == self.fail_on_upsert:
+            raise RuntimeError("upsert failed")
+        self.ids.update(ids)
+
+    def delete(self, ids: List[str]) -> None:
+        self.deleted_ids.extend(ids)
+        self.ids.difference_update(ids)
+
+
+class FakeChromaClient:
+    """Stand-in for chromadb.HttpClient that serves a single collection."""
+
+    def __init__(self, collection: FakeCollection):
+        self.collection = collection
+
+    def get_or_create_collection(self, **kwargs: Any) -> FakeCollection:
+        return self.collection
+
+
+def make_client(collection: FakeCollection) -> ChromaClient:
+    """
+    Create a ChromaClient that talks to a fake collection.
+
+    Args:
+        collection: Collection the client serves
+
+    Returns:
+        ChromaClient without a server connection
+    """
+    client = ChromaClient.__new__(ChromaClient)
+    client.chroma_client = FakeChromaClient(collection)
+    return client
+
+
+def make_batch(*contents: str) -> tuple:
+    """
+    Create a batch of documents with dummy embeddings.
+
+    Args:
+        contents: Page content of each document
+
+    Returns:
+        Tuple of (embeddings, documents, metadatas) as update_batches expects
+    """
+    documents = [{"page_content": content} for content in contents]
+    metadatas = [{"title": content} for content in contents]
+    return [[0.0, 1.0] for _ in contents], documents, metadatas
+
+
+def document_ids(*contents: str) -> List[str]:
+    """
+    Get the IDs update_batches gives to documents from make_batch.
+
+    Args:
+        contents: Page content of each document
+
+    Returns:
+        Document IDs, in order
+    """
+    seen_ids = set()
+    _, documents, metadatas = make_batch(*contents)
+    for document, metadata in zip(documents, metadatas):
+        seen_ids.add(ChromaClient._document_id(document, metadata, seen_ids))
+    return list(seen_ids)
+
+
+class UpdateBatchesTest(unittest.TestCase):
+    def test_deletes_stale_documents(self):
+        collection = FakeCollection(document_ids("a", "b") + ["stale"])
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection",
+            [make_batch("a", "b")],
+            delete_stale=lambda: True,
+        )
+
+        self.assertTrue(result["success"], result["message"])
+        self.assertEqual(collection.deleted_ids, ["stale"])
+
+    def test_keeps_stale_documents_if_update_is_incomplete(self):
+        collection = FakeCollection(document_ids("a", "b") + ["stale"])
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection",
+            [make_batch("a", "b")],
+            delete_stale=lambda: False,
+        )
+
+        self.assertTrue(result["success"], result["message"])
+        self.assertEqual(collection.deleted_ids, [])
+        self.assertIn("incomplete", result["message"])
+
+    def test_keeps_stale_documents_if_too_few_were_seen(self):
+        collection = FakeCollection(["stale 1", "stale 2", "stale 3"])
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection",
+            [make_batch("a")],
+            delete_stale=lambda: True,
+            min_seen_fraction=0.5,
+        )
+
+        self.assertTrue(result["success"], result["message"])
+        self.assertEqual(collection.deleted_ids, [])
+        self.assertIn("only 1 of 3", result["message"])
+
+    def test_deletes_stale_documents_at_min_seen_fraction(self):
+        collection = FakeCollection(["stale 1", "stale 2"])
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection", [make_batch("a")], min_seen_fraction=0.5
+        )
+
+        self.assertTrue(result["success"], result["message"])
+        self.assertCountEqual(collection.deleted_ids, ["stale 1", "stale 2"])
+
+    def test_rolls_back_only_added_documents(self):
+        existing_ids = document_ids("a") + ["stale"]
+        collection = FakeCollection(existing_ids, fail_on_upsert=2)
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection",
+            [make_batch("a", "b"), make_batch("c")],
+            delete_stale=lambda: True,
+        )
+
+        self.assertFalse(result["success"])
+        self.assertEqual(collection.deleted_ids, document_ids("b"))
+        self.assertCountEqual(collection.ids, existing_ids)
+
+    def test_duplicate_documents_get_distinct_ids(self):
+        collection = FakeCollection()
+        client = make_client(collection)
+
+        result = client.update_batches(
+            "collection", [make_batch("a", "a"), make_batch("a")]
+        )
+
+        self.assertTrue(result["success"], result["message"])
+        self.assertEqual(len(collection.ids), 3)
+        self.assertCountEqual(collection.ids, document_ids("a", "a", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
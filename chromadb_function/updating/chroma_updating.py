@@ -1,7 +1,9 @@
-import uuid
-from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import chromadb
+from chromadb.errors import InvalidCollectionException, NotFoundError
 
 
 class ChromaClient:
@@ -9,30 +11,38 @@ class ChromaClient:
     Class for managing ChromaDB collections, including creating, updating and deleting collections.
     """
 
-    def __init__(self, chroma_host: str, chroma_port: int, embedder: Callable):
+    def __init__(self, chroma_host: str, chroma_port: int):
         """
         Initialize ChromaDB client with connection parameters.
 
+        Collections are created without an embedding function, since documents
+        are always added with precomputed embeddings.
+
         Args:
             chroma_host: Host address of the ChromaDB server
             chroma_port: Port number of the ChromaDB server
-            embedder: Function to use for generating embeddings
         """
         self.chroma_client = chromadb.HttpClient(host=chroma_host, port=chroma_port)
-        self.embedder = embedder
 
     def collection_exists(self, collection_name: str) -> bool:
         """
         Check if a collection exists.
 
+        Looks the collection up by name instead of listing all collections.
+
         Args:
             collection_name: Name of the collection to check
 
         Returns:
             True if collection exists, False otherwise
         """
-        collections = self.chroma_client.list_collections()
-        return any(col == collection_name for col in collections)
+        try:
+            self.chroma_client.get_collection(
+                name=collection_name, embedding_function=None
+            )
+        except (InvalidCollectionException, NotFoundError, ValueError):
+            return False
+        return True
 
     def delete_collection(self, collection_name: str) -> Dict[str, Any]:
         """
@@ -69,15 +79,21 @@ class ChromaClient:
         embeddings: List[Any],
         documents: List[Any],
         metadatas: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 1000,
     ) -> Dict[str, Any]:
         """
         Update a collection by recreating it with new data.
 
+        Documents are added batch_size at a time, so that no single request
+        has to carry the whole corpus. IDs are derived from the content and
+        metadata of each document, as in update_batches.
+
         Args:
             collection_name: Name of the collection to update
             embeddings: List of embeddings to add to the collection
             documents: List of documents to add to the collection
             metadatas: Optional list of metadata for each document
+            batch_size: Maximum number of documents per add request
 
         Returns:
             Dictionary containing success status and message
@@ -87,25 +103,37 @@ class ChromaClient:
         try:
             self._validate_inputs(collection_name, embeddings, documents, metadatas)
 
-            if self.collection_exists(collection_name):
-                delete_result = self.delete_collection(collection_name)
-                if not delete_result["success"]:
-                    return delete_result
+            delete_result = self.delete_collection(collection_name)
+            if not delete_result["success"]:
+                return delete_result
 
             collection = self.chroma_client.create_collection(
                 name=collection_name,
-                embedding_function=self.embedder,
+                embedding_function=None,
                 metadata={"hnsw:space": "cosine"},
             )
 
-            ids = [str(uuid.uuid4()) for _ in range(len(embeddings))]
+            seen_ids: Set[str] = set()
+            ids = []
+            for index, document in enumerate(documents):
+                document_id = self._document_id(
+                    document, metadatas[index] if metadatas else None, seen_ids
+                )
+                seen_ids.add(document_id)
+                ids.append(document_id)
 
-            collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                documents=[document.get("page_content") for document in documents],
-            )
+            for start in range(0, len(documents), batch_size):
+                batch_documents = documents[start : start + batch_size]
+                collection.add(
+                    ids=ids[start : start + batch_size],
+                    embeddings=embeddings[start : start + batch_size],
+                    metadatas=(
+                        metadatas[start : start + batch_size] if metadatas else None
+                    ),
+                    documents=[
+                        document.get("page_content") for document in batch_documents
+                    ],
+                )
 
             result["success"] = True
             result["message"] = (
@@ -119,6 +147,158 @@ class ChromaClient:
 
         return result
 
+    def update_batches(
+        self,
+        collection_name: str,
+        batches: Iterable[Tuple[List[Any], List[Any], Optional[List[Dict[str, Any]]]]],
+        batch_size: int = 1000,
+        delete_stale: Optional[Callable[[], bool]] = None,
+        min_seen_fraction: float = 0.5,
+    ) -> Dict[str, Any]:
+        """
+        Update a collection in place from a stream of batches.
+
+        Each document gets an ID derived from its content and metadata, so
+        documents that are already in the collection are skipped and only new
+        or changed documents are added. Documents of the collection missing
+        from the batches are deleted once all batches were added, unless
+        delete_stale returns False or the batches held fewer documents than
+        min_seen_fraction of the collection. A truncated listing or pages that
+        failed to process therefore leave their documents in place instead of
+        wiping them. If any batch fails, the documents added so far are deleted again
+        and the collection is left as it was.
+
+        Args:
+            collection_name: Name of the collection to update
+            batches: Tuples of (embeddings, documents, metadatas), where
+                metadatas is an optional list of metadata for each document
+            batch_size: Maximum number of IDs per delete request
+            delete_stale: Optional function called once all batches were
+                added. Stale documents are kept if it returns False.
+            min_seen_fraction: Smallest number of documents in the batches,
+                as a fraction of the existing documents, for which stale
+                documents are deleted
+
+        Returns:
+            Dictionary containing success status and message
+        """
+        result = {"success": False, "message": ""}
+        added_ids: List[str] = []
+        collection = None
+
+        try:
+            if not collection_name or not isinstance(collection_name, str):
+                raise ValueError("Collection name must be a non-empty string")
+
+            collection = self.chroma_client.get_or_create_collection(
+                name=collection_name,
+                embedding_function=None,
+                metadata={"hnsw:space": "cosine"},
+            )
+            existing_ids = set(collection.get(include=[])["ids"])
+
+            seen_ids: Set[str] = set()
+            for embeddings, documents, metadatas in batches:
+                self._validate_inputs(collection_name, embeddings, documents, metadatas)
+
+                new_indexes = []
+                for index, document in enumerate(documents):
+                    document_id = self._document_id(
+                        document, metadatas[index] if metadatas else None, seen_ids
+                    )
+                    seen_ids.add(document_id)
+                    if document_id not in existing_ids:
+                        new_indexes.append((index, document_id))
+
+                if not new_indexes:
+                    continue
+
+                ids = [document_id for _, document_id in new_indexes]
+                collection.upsert(
+                    ids=ids,
+                    embeddings=[embeddings[index] for index, _ in new_indexes],
+                    metadatas=(
+                        [metadatas[index] for index, _ in new_indexes]
+                        if metadatas
+                        else None
+                    ),
+                    documents=[
+                        documents[index].get("page_content") for index, _ in new_indexes
+                    ],
+                )
+                added_ids.extend(ids)
+
+            if not seen_ids:
+                raise ValueError("Documents must be a non-empty list")
+
+            stale_ids = list(existing_ids - seen_ids)
+            skip_reason = None
+            if stale_ids and delete_stale is not None and not delete_stale():
+                skip_reason = "the update is incomplete"
+            elif len(seen_ids) < min_seen_fraction * len(existing_ids):
+                skip_reason = (
+                    f"only {len(seen_ids)} of {len(existing_ids)} documents were seen"
+                )
+
+            if skip_reason is None:
+                for start in range(0, len(stale_ids), batch_size):
+                    collection.delete(ids=stale_ids[start : start + batch_size])
+
+            result["success"] = True
+            result["message"] = (
+                f"Collection '{collection_name}' successfully updated with "
+                f"{len(seen_ids)} documents: {len(added_ids)} added, "
+                + (
+                    f"{len(stale_ids)} deleted."
+                    if skip_reason is None
+                    else f"{len(stale_ids)} stale kept because {skip_reason}."
+                )
+            )
+
+        except ValueError as e:
+            result["message"] = f"Validation error: {str(e)}"
+        except Exception as e:
+            result["message"] = f"Unexpected error: {str(e)}"
+
+        if not result["success"] and added_ids:
+            try:
+                for start in range(0, len(added_ids), batch_size):
+                    collection.delete(ids=added_ids[start : start + batch_size])
+            except Exception as e:
+                result["message"] += f" Rolling back added documents failed: {str(e)}"
+
+        return result
+
+    @staticmethod
+    def _document_id(
+        document: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]],
+        seen_ids: Set[str],
+    ) -> str:
+        """
+        Derive a document ID from the document's content and metadata.
+
+        Identical documents get IDs numbered by occurrence, so that every ID
+        is unique while staying stable between runs.
+
+        Args:
+            document: Document to add
+            metadata: Optional metadata of the document
+            seen_ids: IDs already given to documents in this update
+
+        Returns:
+            Hex digest identifying the document
+        """
+        content = json.dumps([document, metadata], sort_keys=True, default=str)
+        occurrence = 0
+        while True:
+            document_id = hashlib.blake2b(
+                f"{occurrence}\0{content}".encode(), digest_size=16
+            ).hexdigest()
+            if document_id not in seen_ids:
+                return document_id
+            occurrence += 1
+
     def _validate_inputs(
         self,
         collection_name: str,
@@ -1,14 +1,22 @@
+import os
+
 # ChromaDB
 COLLECTION_NAME = "collection_text-embedding-005"
 CHROMA_HOST = ...
 CHROMA_PORT = ...
 RETRIEVAL_RESULTS = 5
 
+# Semantic cache of answers to similar queries
+SEMANTIC_CACHE_SIZE = 1000
+SEMANTIC_CACHE_TTL_SECONDS = 300
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
 # Vertex AI embedding model
 VERTEXAI_MODEL_EMBEDDING_NAME = "text-embedding-005"
 # Use "QUESTION_ANSWERING" or "RETRIEVAL_QUERY"
 VERTEXAI_TASK_TYPE = "QUESTION_ANSWERING"
 VECTOR_DIMENSIONS = 512
+VERTEXAI_EMBEDDING_BATCH_SIZE = 250
 _RESPONSE_SCHEMA = {
     "type": "object",
     "properties": {
@@ -42,3 +50,8 @@ VERTEXAI_MODEL_NAME = "gemini-1.5-flash"
 
 # Google Chat
 GOOGLE_CHAT_SCOPES = ["https://www.googleapis.com/auth/chat.bot"]
+
+# Warm up the clients when the module is imported. Only deployed instances,
+# where Cloud Run sets K_SERVICE, warm up, so imports in tests and local
+# runs stay offline. WARM_UP=0 or WARM_UP=1 overrides the default.
+WARM_UP = os.environ.get("WARM_UP", "1" if "K_SERVICE" in os.environ else "0") == "1"
@@ -1,8 +1,47 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    InternalServerError,
+    ResourceExhausted,
+    ServiceUnavailable,
+)
+from tenacity import (
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 
+# Vertex AI errors worth retrying: rate limits, overload and server failures
+TRANSIENT_ERRORS = (
+    DeadlineExceeded,
+    InternalServerError,
+    ResourceExhausted,
+    ServiceUnavailable,
+)
+
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str) -> TextEmbeddingModel:
+    """
+    Returns the embedding model client, loading it once per process.
+
+    Embedders and tokenizers of the same model share the client, and warm
+    function instances reuse it across invocations.
+
+    Args:
+        model_name: Name of the pretrained embedding model.
+
+    Returns:
+        Embedding model client.
+    """
+    return TextEmbeddingModel.from_pretrained(model_name)
+
 
 class VertexAIChromaEmbedder(EmbeddingFunction[Documents]):
     """
@@ -15,8 +54,9 @@ class VertexAIChromaEmbedder(EmbeddingFunction[Documents]):
         model_name: str,
         task_type: str,
         dimensions: Optional[int] = None,
-        batch_size: int = 5,
+        batch_size: int = 250,
         retry_attempts: int = 3,
+        retry_delay: float = 1.0,
     ) -> None:
         """
         Initializes the embedder based on Vertex AI.
@@ -32,14 +72,17 @@ class VertexAIChromaEmbedder(EmbeddingFunction[Documents]):
                 - "CLUSTERING": for clustering tasks
             dimensions: Target dimensionality of output embeddings. If None,
                        the model's default dimensionality is used.
-            batch_size: Batch size for processing texts.
+            batch_size: Maximum number of texts per API call.
             retry_attempts: Number of retry attempts for API errors.
+            retry_delay: Delay before the first retry in seconds, doubled for
+                every further retry.
         """
-        self.model = TextEmbeddingModel.from_pretrained(model_name)
+        self.model = _get_model(model_name)
         self.task_type = task_type
         self.dimensions = dimensions
         self.batch_size = batch_size
         self.retry_attempts = retry_attempts
+        self.retry_delay = retry_delay
 
     def __call__(self, input: Documents) -> Embeddings:
         """
@@ -62,7 +105,11 @@ class VertexAIChromaEmbedder(EmbeddingFunction[Documents]):
 
     def _get_embeddings_with_retry(self, texts: List[str]) -> List[List[float]]:
         """
-        Gets embeddings with retry support for error handling.
+        Gets embeddings, retrying transient API errors.
+
+        Rate limits, unavailability and server errors are retried with
+        exponential backoff and jitter, so that concurrent calls do not retry
+        in lockstep. Other errors, such as invalid input, fail immediately.
 
         Args:
             texts: List of strings to embed.
@@ -71,21 +118,16 @@ class VertexAIChromaEmbedder(EmbeddingFunction[Documents]):
             List of embedding vectors.
 
         Raises:
-            Exception: If all embedding attempts fail.
+            Exception: If the error is not transient or all attempts fail.
         """
-        attempts = 0
-        last_error = None
-
-        while attempts < self.retry_attempts:
-            try:
-                return self._get_embeddings_batch(texts)
-            except Exception as e:
-                attempts += 1
-                last_error = e
-
-        raise Exception(
-            f"Failed to get embeddings after {self.retry_attempts} attempts: {last_error}"
+        retrying = Retrying(
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=wait_exponential(multiplier=self.retry_delay, max=30)
+            + wait_random(0, self.retry_delay),
+            retry=retry_if_exception_type(TRANSIENT_ERRORS),
+            reraise=True,
         )
+        return retrying(self._get_embeddings_batch, texts)
 
     def _get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """
@@ -145,20 +187,21 @@ class VertexAITokenizer:
                 - "CLASSIFICATION": for classification tasks
                 - "CLUSTERING": for clustering tasks
         """
-        self.model = TextEmbeddingModel.from_pretrained(model_name)
+        self.model = _get_model(model_name)
         self.task_type = task_type
 
     def __call__(self, text: str) -> int:
         """
-        Counts tokens in the provided text using Vertex AI's model statistics.
+        Counts tokens in the provided text using Vertex AI's CountTokens API.
         This method allows the tokenizer to be used as a callable function.
 
+        Unlike an embedding request, counting does not run the model and is
+        not billed.
+
         Args:
             text: String text to tokenize and count.
 
         Returns:
             Number of tokens in the input text according to the model.
         """
-        inputs = [TextEmbeddingInput(text=text, task_type=self.task_type)]
-        embeddings = self.model.get_embeddings(inputs)
-        return embeddings[0].statistics.token_count
+        return self.model.count_tokens([text]).total_tokens
@@ -1,21 +1,17 @@
-from utils.google_chat_client import create_client_with_default_credentials
-from utils.formater import TextFormater
-from vertexai.generative_models import GenerativeModel, GenerationConfig, Content, Part
-from prompting.templates import PromptTemplate, SystemInstructions, SafetySettings
-from retrieval.retriever import ChromaRetriever
-from embedding.embedder import VertexAIChromaEmbedder
-import json
 import base64
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict
 
 import config
 import functions_framework
+import orjson
 from embedding.embedder import VertexAIChromaEmbedder
 from google.apps import chat_v1 as google_chat
 from prompting.templates import PromptTemplate, SafetySettings, SystemInstructions
-from retrieval.retriever import ChromaRetriever
+from retrieval.retriever import ChromaRetriever, RetrievalError
+from retrieval.semantic_cache import SemanticCache
 from utils.formater import TextFormater
 from utils.google_chat_client import create_client_with_default_credentials
 from vertexai.generative_models import Content, GenerationConfig, GenerativeModel, Part
@@ -24,6 +20,18 @@ logging.basicConfig(level=logging.INFO)
 
 logger = logging.getLogger(__name__)
 
+# from_dict converts the response schema into a proto Schema, so the config
+# is built once per instance rather than for every query
+GENERATION_CONFIG = GenerationConfig.from_dict(config.GENERATION_CONFIG)
+SAFETY_SETTINGS = SafetySettings.standard_settings()
+
+# Module level, so that warm instances keep answers across invocations
+semantic_cache = SemanticCache(
+    max_size=config.SEMANTIC_CACHE_SIZE,
+    ttl_seconds=config.SEMANTIC_CACHE_TTL_SECONDS,
+    threshold=config.SEMANTIC_CACHE_THRESHOLD,
+)
+
 
 @functions_framework.cloud_event
 def chat_app(cloud_event) -> Dict[str, Any]:
@@ -39,14 +47,12 @@ def chat_app(cloud_event) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: The response from the Chat API after creating a message.
     """
-    chat = create_client_with_default_credentials(config.GOOGLE_CHAT_SCOPES)
-
     message_data = cloud_event.data.get("message").get("data")
     if not message_data:
         logger.error("No message data found in cloud event")
         return {"error": "No message data found"}
 
-    event = json.loads(base64.b64decode(message_data).decode("utf-8"))
+    event = orjson.loads(base64.b64decode(message_data))
 
     processed_response = "Sorry, I couldn't process your request."
 
@@ -55,7 +61,7 @@ def chat_app(cloud_event) -> Dict[str, Any]:
         if query:
             processed_response = process_query(query)
     else:
-        logger.info(f"Ignoring non-MESSAGE event of type: {event.get('type')}")
+        logger.info("Ignoring non-MESSAGE event of type: %s", event.get("type"))
         return {"status": "ignored"}
 
     space_name = event.get("space", {}).get("name")
@@ -73,8 +79,9 @@ def chat_app(cloud_event) -> Dict[str, Any]:
     )
 
     try:
-        chat_response = chat.create_message(request)
-        logger.info(f"Message sent successfully: {chat_response}")
+        chat_response = get_chat_client().create_message(request)
+        logger.info("Message sent successfully: %s", chat_response.name)
+        logger.debug("Chat API response: %s", chat_response)
         return chat_response
     except Exception as e:
         logger.error(f"Error sending message: {str(e)}", exc_info=True)
@@ -86,10 +93,12 @@ def process_query(query: str) -> str:
     Processes a user query by retrieving relevant context and generating a response.
 
     This function handles the core processing logic:
-    1. Embeds the query using VertexAI embeddings
-    2. Retrieves relevant documents from a Chroma vector database
-    3. Formats the context for the LLM prompt
-    4. Generates a response using VertexAI generative models
+    1. Returns the cached response of an earlier query with the same text, if any
+    2. Embeds the query using VertexAI embeddings and returns the cached
+       response of a near-identical earlier query, if any
+    3. Retrieves relevant documents from a Chroma vector database
+    4. Formats the context for the LLM prompt
+    5. Generates a response using VertexAI generative models
 
     Args:
         query: The user's question or request text
@@ -98,48 +107,43 @@ def process_query(query: str) -> str:
         str: The generated response text, or an error message if processing fails
     """
     try:
-        logger.info(f"Processing query: {query}")
+        logger.info("Processing query: %s", query)
 
-        embedder = VertexAIChromaEmbedder(
-            model_name=config.VERTEXAI_MODEL_EMBEDDING_NAME,
-            task_type=config.VERTEXAI_TASK_TYPE,
-            dimensions=config.VECTOR_DIMENSIONS,
-        )
+        cached_result = semantic_cache.get_exact(query)
+        if cached_result is not None:
+            logger.info("Answered repeated query from cache: %s", query)
+            return cached_result
 
-        retriever = ChromaRetriever(
-            host=config.CHROMA_HOST,
-            port=config.CHROMA_PORT,
-            collection_name=config.COLLECTION_NAME,
-            embedding_function=embedder,
-        )
+        embedder = get_embedder()
+        retriever = get_retriever()
+
+        query_embedding = embedder([query])[0]
+
+        cached_result = semantic_cache.get(query_embedding)
+        if cached_result is not None:
+            logger.info("Answered query from semantic cache: %s", query)
+            return cached_result
 
         retrieval_result = retriever.retrieve(
-            query=query, n_results=config.RETRIEVAL_RESULTS
+            query=query,
+            n_results=config.RETRIEVAL_RESULTS,
+            query_embedding=query_embedding,
         )
 
         document_text = TextFormater.format_retrieval_documents(retrieval_result)
-        system_instruction = SystemInstructions.qa_system_instruction()
 
         user_prompt = PromptTemplate.qa_prompt(query, document_text)
         content_user = Content(role="user", parts=[Part.from_text(user_prompt)])
-        part_system = Part.from_text(system_instruction)
 
-        model = GenerativeModel(
-            model_name=config.VERTEXAI_MODEL_NAME,
-            system_instruction=part_system,
-        )
-
-        safety_settings = SafetySettings.standard_settings()
-
-        generative_config = GenerationConfig.from_dict(config.GENERATION_CONFIG)
+        model = get_generative_model()
 
         response = model.generate_content(
             contents=[content_user],
-            generation_config=generative_config,
-            safety_settings=safety_settings,
+            generation_config=GENERATION_CONFIG,
+            safety_settings=SAFETY_SETTINGS,
         )
 
-        generation = json.loads(response.candidates[0].content.parts[0].text)
+        generation = orjson.loads(response.candidates[0].content.parts[0].text)
         generation_with_grounding = TextFormater.format_grounding_links(
             generation, retrieval_result["metadatas"]
         )
@@ -148,8 +152,121 @@ def process_query(query: str) -> str:
             generation_with_grounding["answer"], retrieval_result["metadatas"]
         )
 
-        logger.info(f"Generated response for query: {query}\n{result}")
+        semantic_cache.put(query_embedding, result, query=query)
+
+        # The response itself is only logged at DEBUG, since it can be several
+        # KB; the arguments are formatted only if a record is emitted
+        logger.info(
+            "Generated response of %d characters for query: %s", len(result), query
+        )
+        logger.debug("Response for query: %s\n%s", query, result)
         return result
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}", exc_info=True)
+        # The collection may have been recreated, so the next query reconnects
+        if isinstance(e, RetrievalError):
+            get_retriever.cache_clear()
         return f"Sorry, an error occurred while processing your request: {str(e)}"
+
+
+@lru_cache(maxsize=1)
+def get_chat_client() -> google_chat.ChatServiceClient:
+    """
+    Get the Chat client, creating it on the first invocation.
+
+    Warm function instances reuse the client, its credentials and its gRPC
+    channel.
+
+    Returns:
+        google_chat.ChatServiceClient: Chat client
+    """
+    return create_client_with_default_credentials(config.GOOGLE_CHAT_SCOPES)
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> VertexAIChromaEmbedder:
+    """
+    Get the query embedder, creating it on the first invocation.
+
+    Returns:
+        VertexAIChromaEmbedder: Embedding function for queries
+    """
+    return VertexAIChromaEmbedder(
+        model_name=config.VERTEXAI_MODEL_EMBEDDING_NAME,
+        task_type=config.VERTEXAI_TASK_TYPE,
+        dimensions=config.VECTOR_DIMENSIONS,
+        batch_size=config.VERTEXAI_EMBEDDING_BATCH_SIZE,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_retriever() -> ChromaRetriever:
+    """
+    Get the Chroma retriever, connecting on the first invocation.
+
+    Connecting checks the tenant, database and collection on the server,
+    which warm function instances skip by reusing the retriever and its
+    pooled HTTP connections.
+
+    Returns:
+        ChromaRetriever: Retriever of the document collection
+    """
+    return ChromaRetriever(
+        host=config.CHROMA_HOST,
+        port=config.CHROMA_PORT,
+        collection_name=config.COLLECTION_NAME,
+        embedding_function=get_embedder(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_generative_model() -> GenerativeModel:
+    """
+    Get the generative model, creating it on the first invocation.
+
+    Returns:
+        GenerativeModel: Model with the QA system instruction
+    """
+    return GenerativeModel(
+        model_name=config.VERTEXAI_MODEL_NAME,
+        system_instruction=Part.from_text(SystemInstructions.qa_system_instruction()),
+    )
+
+
+def warm_up() -> None:
+    """
+    Create the clients and authenticate against the services on cold start.
+
+    Runs when the module is imported if config.WARM_UP is set, so a new
+    instance creates its clients, mints its access tokens and connects to
+    Chroma before it receives its first event, rather than while answering
+    it. The embedding model is warmed with a CountTokens call, which uses the
+    same endpoint and credentials as an embedding request but is not billed.
+    The steps are independent and run in parallel. A failing step is only
+    logged, since the first query retries it. With min_instances of at least
+    1, an instance is always warm.
+    """
+    # Created up front, as the retriever and the embedding step both use it
+    try:
+        get_embedder()
+    except Exception as e:
+        logger.warning(f"Embedder warm-up failed: {str(e)}")
+        return
+
+    steps = {
+        "Chat client": get_chat_client,
+        "Chroma connection": get_retriever,
+        "Embedding model": lambda: get_embedder().model.count_tokens(["warm-up"]),
+        "Generative model": get_generative_model,
+    }
+
+    with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+        futures = {name: executor.submit(step) for name, step in steps.items()}
+
+    for name, future in futures.items():
+        if future.exception() is not None:
+            logger.warning(f"{name} warm-up failed: {str(future.exception())}")
+
+
+if config.WARM_UP:
+    warm_up()
@@ -17,10 +17,13 @@ class PromptTemplate:
         """
         Create a question-answering prompt that instructs the model to use only provided context.
 
+        The system instruction is passed to the model separately, so every
+        request starts with the same instruction and the prompt only carries
+        the retrieved context and the question.
+
         Args:
             query: The user's question
             context: Retrieved information to ground the model's response
-            system_instruction: Optional system instruction to include in the prompt
 
         Returns:
             A formatted prompt string for question-answering
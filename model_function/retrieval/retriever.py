@@ -1,5 +1,5 @@
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 import chromadb
 from embedding.embedder import VertexAIChromaEmbedder
@@ -8,6 +8,10 @@ __import__("pysqlite3")
 sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
 
 
+class RetrievalError(Exception):
+    """Raised when querying the ChromaDB collection fails."""
+
+
 class ChromaRetriever:
     """
     A class for working with ChromaDB to retrieve and format relevant documents.
@@ -62,6 +66,7 @@ class ChromaRetriever:
         n_results: int = 5,
         where: Optional[Dict[str, Any]] = None,
         where_document: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[Sequence[float]] = None,
     ) -> Dict[str, Any]:
         """
         Retrieve relevant documents from ChromaDB based on the query.
@@ -71,12 +76,19 @@ class ChromaRetriever:
             n_results: Number of results to retrieve
             where: Optional filter for metadata
             where_document: Optional filter for document content
+            query_embedding: Optional embedding of the query. If given, the
+                query is not embedded again.
 
         Returns:
             Dictionary containing query results from ChromaDB
         """
         try:
-            query_params = {"query_texts": [query], "n_results": n_results}
+            query_params = {"n_results": n_results}
+
+            if query_embedding is not None:
+                query_params["query_embeddings"] = [query_embedding]
+            else:
+                query_params["query_texts"] = [query]
 
             if where:
                 query_params["where"] = where
@@ -88,4 +100,4 @@ class ChromaRetriever:
             return results
 
         except Exception as e:
-            raise Exception(f"Failed to retrieve documents: {str(e)}")
+            raise RetrievalError(f"Failed to retrieve documents: {str(e)}") from e
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    An in-memory cache of answers keyed by query embeddings.
+
+    A query is answered from the cache when the cosine similarity between its
+    embedding and the embedding of a previously answered query reaches the
+    threshold. Embeddings are L2-normalized on insertion, so a lookup is a
+    single matrix-vector product over all cached queries. Repeats of a cached
+    query text can be answered without embedding them first. The least
+    recently used answer is evicted when the cache is full, and answers older
+    than ttl_seconds are dropped when they are hit.
+    """
+
+    def __init__(
+        self, max_size: int = 1000, ttl_seconds: float = 300.0, threshold: float = 0.95
+    ) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of cached answers
+            ttl_seconds: Time after which a cached answer is no longer returned
+            threshold: Minimum cosine similarity between a query and a cached
+                query for the cached answer to be returned
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None
+        # Slot of the vector in _vectors -> (answer, insertion time, query key),
+        # in LRU order
+        self._entries: "OrderedDict[int, Tuple[str, float, Optional[str]]]" = (
+            OrderedDict()
+        )
+        self._slots_by_query: Dict[str, int] = {}
+        self._free_slots: List[int] = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def get(self, embedding: Sequence[float]) -> Optional[str]:
+        """
+        Look up the answer of the most similar cached query.
+
+        Similar queries are tried from the most similar one on, so an expired
+        answer does not hide a valid answer to a slightly less similar query.
+
+        Args:
+            embedding: Embedding of the query
+
+        Returns:
+            The cached answer, or None if no cached query is similar enough
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if not self._entries:
+                return None
+
+            similarities = self._vectors @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                slot = int(slot)
+                if slot not in self._entries:
+                    continue
+                answer = self._hit(slot)
+                if answer is not None:
+                    return answer
+
+            return None
+
+    def get_exact(self, query: str) -> Optional[str]:
+        """
+        Look up the answer of a cached query with the same text.
+
+        Texts are compared ignoring case and whitespace.
+
+        Args:
+            query: Text of the query
+
+        Returns:
+            The cached answer, or None if the query text is not cached
+        """
+        key = self._query_key(query)
+
+        with self._lock:
+            slot = self._slots_by_query.get(key)
+            if slot is None:
+                return None
+
+            return self._hit(slot)
+
+    def put(
+        self, embedding: Sequence[float], answer: str, query: Optional[str] = None
+    ) -> None:
+        """
+        Cache the answer to a query, evicting the least recently used answer
+        if the cache is full.
+
+        Args:
+            embedding: Embedding of the query
+            answer: Answer to return for similar queries
+            query: Optional text of the query, to answer repeats of it with
+                get_exact
+        """
+        vector = self._normalize(embedding)
+        key = self._query_key(query) if query is not None else None
+
+        with self._lock:
+            if key in self._slots_by_query:
+                self._remove(self._slots_by_query[key])
+
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, len(vector)), np.float32)
+
+            if not self._free_slots:
+                self._remove(next(iter(self._entries)))
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = (answer, time.monotonic(), key)
+            if key is not None:
+                self._slots_by_query[key] = slot
+
+    def _hit(self, slot: int) -> Optional[str]:
+        """
+        Return a cached answer, unless it has expired. Must be called with the
+        lock held.
+
+        Args:
+            slot: Slot of the answer
+
+        Returns:
+            The cached answer, or None if it has expired
+        """
+        answer, created_at, _ = self._entries[slot]
+        if time.monotonic() - created_at > self.ttl_seconds:
+            self._remove(slot)
+            return None
+
+        self._entries.move_to_end(slot)
+        return answer
+
+    def _remove(self, slot: int) -> None:
+        """
+        Remove a cached answer. Must be called with the lock held.
+
+        The vector is zeroed, so its similarity to any query stays below the
+        threshold.
+
+        Args:
+            slot: Slot of the answer to remove
+        """
+        _, _, key = self._entries.pop(slot)
+        if key is not None:
+            del self._slots_by_query[key]
+        self._vectors[slot] = 0
+        self._free_slots.append(slot)
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        """
+        Normalize a query text for exact matching.
+
+        Args:
+            query: Text of the query
+
+        Returns:
+            Lowercased query text with runs of whitespace collapsed
+        """
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """
+        Convert an embedding into a unit-length float32 vector.
+
+        Args:
+            embedding: Embedding to normalize
+
+        Returns:
+            L2-normalized embedding
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector